@@ -0,0 +1,210 @@
+"""
+Módulo de control de admisión por presupuesto de memoria.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pydicom as dicom
+
+from read_img import as_dicom_source
+
+
+MEMORY_BUDGET_ENV_VAR = "NEUMONIA_MEMORY_BUDGET_MB"
+ADMISSION_TIMEOUT_ENV_VAR = "NEUMONIA_ADMISSION_TIMEOUT"
+
+# Bytes por píxel que ImageLoader crea además del pixel_array original:
+# dos arrays float64 temporales durante la normalización (16), el frame
+# uint8 (1) y la copia RGB de 3 canales (3).
+WORKING_BYTES_PER_PIXEL = 16 + 1 + 3
+# Bytes por píxel que conserva cada frame ya normalizado mientras espera
+# su lote: solo la copia RGB uint8; los temporales de arriba existen para
+# un único frame a la vez.
+RETAINED_BYTES_PER_PIXEL = 3
+
+
+class MemoryBudgetError(ValueError):
+    """La solicitud no cabe en el presupuesto de memoria configurado."""
+
+
+def _read_image_header(path):
+    """
+    Lee el header de un DICOM y retorna sus dimensiones.
+
+    Returns:
+        tuple: (pixels por frame, bytes crudos por píxel, frames)
+
+    Raises:
+        ValueError: Si el header no contiene las dimensiones de la imagen.
+    """
+    source = as_dicom_source(path)
+    start = source.tell() if hasattr(source, "tell") else None
+    try:
+        header = dicom.dcmread(source, stop_before_pixels=True)
+    finally:
+        if start is not None:
+            source.seek(start)
+    try:
+        rows = int(header.Rows)
+        cols = int(header.Columns)
+        bits = int(header.BitsAllocated)
+    except AttributeError as e:
+        raise ValueError(f"No se pudo estimar la memoria de la imagen: {e}")
+
+    samples = int(getattr(header, "SamplesPerPixel", 1) or 1)
+    frames = int(getattr(header, "NumberOfFrames", 1) or 1)
+    return rows * cols, samples * ((bits + 7) // 8), frames
+
+
+def estimate_decode_footprint(path):
+    """
+    Estima la memoria necesaria para decodificar un DICOM a partir del header.
+
+    Solo se lee el encabezado (``stop_before_pixels=True``), por lo que la
+    estimación es barata incluso para archivos grandes.
+
+    Args:
+        path: Ruta del archivo DICOM o entrada en memoria (ver
+            ``ImageLoader``). Los objetos tipo archivo vuelven a su
+            posición original tras leer el header.
+
+    Returns:
+        int: Bytes estimados (rows × cols × frames × bytes por píxel).
+
+    Raises:
+        ValueError: Si el header no contiene las dimensiones de la imagen.
+    """
+    pixels, raw_bytes_per_pixel, frames = _read_image_header(path)
+    return pixels * frames * (raw_bytes_per_pixel + WORKING_BYTES_PER_PIXEL)
+
+
+def estimate_frame_footprint(path):
+    """
+    Estima la memoria de un frame leído de forma perezosa dentro de un lote.
+
+    Args:
+        path: Ruta del archivo DICOM o entrada en memoria.
+
+    Returns:
+        tuple: (decode_bytes, retained_bytes, frames) donde
+            ``decode_bytes`` es la huella transitoria de decodificar y
+            normalizar un frame, ``retained_bytes`` lo que el frame conserva
+            mientras espera al resto de su lote y ``frames`` la cantidad de
+            frames del archivo.
+
+    Raises:
+        ValueError: Si el header no contiene las dimensiones de la imagen.
+    """
+    pixels, raw_bytes_per_pixel, frames = _read_image_header(path)
+    return (
+        pixels * (raw_bytes_per_pixel + WORKING_BYTES_PER_PIXEL),
+        pixels * RETAINED_BYTES_PER_PIXEL,
+        frames,
+    )
+
+
+class AdmissionController:
+    """
+    Admite trabajo solo mientras quepa en un presupuesto de memoria.
+
+    Cada solicitud reserva su huella estimada antes de decodificar y la
+    libera al terminar. Si no hay espacio, la solicitud espera en cola hasta
+    ``timeout`` segundos; las solicitudes que nunca cabrían o que agotan la
+    espera se rechazan con ``MemoryBudgetError`` en lugar de dejar que el
+    proceso se quede sin memoria.
+
+    Attributes:
+        budget_bytes (int): Presupuesto total en bytes.
+        timeout (float | None): Espera máxima en cola; None espera sin límite
+            y 0 rechaza de inmediato.
+        in_use (int): Bytes reservados actualmente.
+    """
+
+    def __init__(self, budget_bytes, timeout=None):
+        """
+        Inicializa el controlador.
+
+        Args:
+            budget_bytes (int): Presupuesto total en bytes.
+            timeout (float | None): Espera máxima en cola en segundos.
+
+        Raises:
+            ValueError: Si el presupuesto no es positivo.
+        """
+        if budget_bytes <= 0:
+            raise ValueError("El presupuesto de memoria debe ser positivo")
+        self.budget_bytes = int(budget_bytes)
+        self.timeout = timeout
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Crea un controlador desde ``NEUMONIA_MEMORY_BUDGET_MB``.
+
+        ``NEUMONIA_ADMISSION_TIMEOUT`` (segundos) fija la espera en cola.
+
+        Returns:
+            AdmissionController | None: None si no hay presupuesto configurado.
+        """
+        budget_mb = os.environ.get(MEMORY_BUDGET_ENV_VAR, "").strip()
+        if not budget_mb:
+            return None
+        timeout = os.environ.get(ADMISSION_TIMEOUT_ENV_VAR, "").strip()
+        return cls(
+            int(float(budget_mb) * 1024 * 1024),
+            float(timeout) if timeout else None,
+        )
+
+    def acquire(self, nbytes, timeout=None):
+        """
+        Reserva ``nbytes`` del presupuesto, esperando en cola si es necesario.
+
+        Args:
+            nbytes (int): Bytes a reservar.
+            timeout (float | None): Espera para esta llamada; None usa la
+                del controlador.
+
+        Raises:
+            MemoryBudgetError: Si la solicitud excede el presupuesto total o
+                no obtuvo espacio dentro del tiempo de espera.
+        """
+        if nbytes > self.budget_bytes:
+            raise MemoryBudgetError(
+                f"La imagen requiere ~{nbytes / 2**20:.1f} MB y el presupuesto "
+                f"es de {self.budget_bytes / 2**20:.1f} MB"
+            )
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while self.in_use + nbytes > self.budget_bytes:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise MemoryBudgetError(
+                        f"Sin memoria disponible para ~{nbytes / 2**20:.1f} MB "
+                        f"({self.in_use / 2**20:.1f} de "
+                        f"{self.budget_bytes / 2**20:.1f} MB en uso); "
+                        "intente más tarde"
+                    )
+                self._condition.wait(remaining)
+            self.in_use += nbytes
+
+    def release(self, nbytes):
+        """Libera una reserva hecha con ``acquire``."""
+        with self._condition:
+            self.in_use = max(self.in_use - nbytes, 0)
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self, nbytes, timeout=None):
+        """Reserva ``nbytes`` durante el bloque ``with``."""
+        self.acquire(nbytes, timeout)
+        try:
+            yield nbytes
+        finally:
+            self.release(nbytes)
@@ -25,6 +25,29 @@ class PneumoniaConsoleApp:
         print(f"Prediccion: {label}")
         print(f"Probabilidad: {probability:.2f}%")
 
+    def run_study(self, source):
+        """Analiza un estudio completo (directorio o DICOM multi-frame)."""
+        result = self.integrator.analyze_study(source)
+
+        print("\nResultados por frame")
+        for frame in result["frames"]:
+            name = os.path.basename(frame["source"])
+            print(
+                f"{name} [{frame['frame']}]: {frame['label']} "
+                f"({frame['probability']:.2f}%)"
+            )
+
+        study = result["study"]
+        print("\nResultado del estudio")
+        print(f"Frames analizados: {study['n_frames']}")
+        print(f"Prediccion: {study['label']}")
+        print(f"Probabilidad: {study['probability']:.2f}%")
+
+    def export_study(self, source, path):
+        """Analiza un estudio o lote y exporta los resultados a un .npy columnar."""
+        count = self.integrator.export_results(source, path)
+        print(f"\n{count} resultados exportados a {path}")
+
     def _prompt_cedula(self):
         """Solicita la cedula hasta que sea valida."""
         while True:
@@ -0,0 +1,159 @@
+"""
+Módulo de exportación columnar de resultados por lotes.
+"""
+
+import numpy as np
+
+
+DEFAULT_LABELS = ("bacteriana", "normal", "viral")
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Espacio reservado para el contador de filas en el header, así el header
+# se puede reescribir en su lugar sin mover los datos ya escritos
+_MAX_ROWS_DIGITS = 20
+
+
+def result_dtype(labels=DEFAULT_LABELS):
+    """
+    Dtype estructurado de una fila de resultados.
+
+    Args:
+        labels (tuple): Etiquetas en el orden de ``Predictor.label_map``;
+            cada una genera una columna ``prob_<etiqueta>``.
+
+    Returns:
+        np.dtype: Columnas source (UTF-8, últimos 128 bytes de la ruta),
+            frame, label_idx, prob_*, load_ms, inference_ms e image_hash.
+    """
+    return np.dtype(
+        [("source", "S128"), ("frame", np.int32), ("label_idx", np.int8)]
+        + [(f"prob_{label}", np.float32) for label in labels]
+        + [("load_ms", np.float32), ("inference_ms", np.float32), ("image_hash", "S32")]
+    )
+
+
+class ColumnarResultWriter:
+    """
+    Escribe resultados por lotes en un archivo ``.npy`` estructurado.
+
+    Las filas se acumulan en un buffer de ``chunk_size`` y se agregan al
+    archivo por bloques durante la corrida. El header se actualiza tras cada
+    bloque, así el archivo es válido en todo momento y puede cargarse con
+    ``np.load(path, mmap_mode="r")`` sin parsear texto.
+
+    Attributes:
+        path (str): Ruta del archivo de salida.
+        labels (tuple): Etiquetas de las columnas de probabilidad.
+        count (int): Filas ya escritas en disco.
+    """
+
+    def __init__(self, path, labels=DEFAULT_LABELS, chunk_size=4096):
+        """
+        Crea (o sobrescribe) el archivo de salida.
+
+        Args:
+            path (str): Ruta del archivo ``.npy``.
+            labels (tuple): Etiquetas en el orden de ``Predictor.label_map``.
+            chunk_size (int): Filas por bloque escrito.
+
+        Raises:
+            ValueError: Si chunk_size no es positivo.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size debe ser mayor o igual a 1")
+        self.path = path
+        self.labels = tuple(labels)
+        self.dtype = result_dtype(self.labels)
+        self.count = 0
+        self._buffer = np.zeros(chunk_size, dtype=self.dtype)
+        self._pending = 0
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _header(self):
+        """Header NPY v1.0 de longitud fija para ``self.count`` filas."""
+        descr = np.lib.format.dtype_to_descr(self.dtype)
+        fields = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({self.count},), }}"
+        max_fields = len(fields) + _MAX_ROWS_DIGITS - len(str(self.count))
+
+        # Magic (8) + longitud (2) + header + '\n', alineado a 64 bytes
+        total = -(-(len(_NPY_MAGIC) + 2 + max_fields + 1) // 64) * 64
+        header_len = total - len(_NPY_MAGIC) - 2
+        header = fields.ljust(header_len - 1) + "\n"
+        return _NPY_MAGIC + header_len.to_bytes(2, "little") + header.encode("latin1")
+
+    def _write_header(self):
+        """Reescribe el header en su lugar y vuelve al final del archivo."""
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.seek(0, 2)
+
+    def append(self, result):
+        """
+        Agrega un resultado de ``PneumoniaIntegrator.iter_study_results``.
+
+        Args:
+            result (dict): Resultado por frame con probabilities, label_idx,
+                image_hash y timings.
+
+        Raises:
+            ValueError: Si el resultado no trae image_hash (se generó sin
+                ``with_hash=True``).
+        """
+        if result["image_hash"] is None:
+            raise ValueError("El resultado no tiene image_hash; use with_hash=True")
+        row = self._buffer[self._pending]
+        source = str(result["source"]).encode("utf-8")[-128:]
+        row["source"] = source.decode("utf-8", "ignore").encode("utf-8")
+        row["frame"] = result["frame"]
+        row["label_idx"] = result["label_idx"]
+        for label, probability in zip(self.labels, result["probabilities"]):
+            row[f"prob_{label}"] = probability
+        row["load_ms"] = result["timings"]["load_ms"]
+        row["inference_ms"] = result["timings"]["inference_ms"]
+        row["image_hash"] = result["image_hash"].encode("ascii")
+
+        self._pending += 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def extend(self, results):
+        """Agrega varios resultados; retorna cuántos se agregaron."""
+        added = 0
+        for result in results:
+            self.append(result)
+            added += 1
+        return added
+
+    def flush(self):
+        """Escribe el bloque pendiente y actualiza el contador del header."""
+        if not self._pending:
+            return
+        self._file.write(self._buffer[:self._pending].tobytes())
+        self.count += self._pending
+        self._pending = 0
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        """Escribe las filas pendientes y cierra el archivo."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_results(path):
+    """
+    Carga un archivo de resultados sin copiarlo a memoria.
+
+    Returns:
+        np.ndarray: Array estructurado mapeado en modo solo lectura.
+    """
+    return np.load(path, mmap_mode="r")
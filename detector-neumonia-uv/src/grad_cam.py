@@ -1,8 +1,16 @@
+import threading
+
 import numpy as np
 import cv2
 import tensorflow as tf
 
 
+# "overlay": imagen RGB (512, 512, 3) lista para mostrar.
+# "cam" / "cam_float16": solo la grilla espacial de conv10_thisone en
+# uint8 [0, 255] o float16 [0, 1]; se colorea luego con compose_overlay.
+HEATMAP_FORMATS = ("overlay", "cam", "cam_float16")
+
+
 class GradCAMGenerator:
     """
     Generador de mapas de calor usando técnica Grad-CAM.
@@ -14,6 +22,8 @@ class GradCAMGenerator:
     Attributes:
         model: Modelo de TensorFlow/Keras cargado.
         input_name (str): Nombre de la capa de entrada del modelo.
+        grad_model: Modelo auxiliar (última capa convolucional + salida),
+            construido una sola vez en el primer uso.
     """
     
     def __init__(self, model):
@@ -32,6 +42,48 @@ class GradCAMGenerator:
         
         # Obtener el nombre de la capa de entrada automáticamente
         self.input_name = self.model.inputs[0].name.split(':')[0]
+        self.grad_model = None
+        self._grad_model_lock = threading.Lock()
+    
+    def _get_grad_model(self):
+        """
+        Retorna el modelo de gradientes, construyéndolo solo la primera vez.
+        
+        Returns:
+            tf.keras.Model: Modelo con salidas [conv10_thisone, predicciones].
+        """
+        if self.grad_model is None:
+            # Evita que dos hilos construyan el modelo a la vez
+            with self._grad_model_lock:
+                if self.grad_model is None:
+                    self.grad_model = tf.keras.models.Model(
+                        inputs=self.model.input,
+                        outputs=[
+                            self.model.get_layer("conv10_thisone").output,
+                            self.model.output
+                        ]
+                    )
+        return self.grad_model
+    
+    def _forward(self, preprocessed_img):
+        """
+        Ejecuta el modelo de gradientes sobre la imagen preprocesada.
+        
+        Debe llamarse dentro de un ``tf.GradientTape`` para poder derivar.
+        
+        Returns:
+            tuple: (conv_outputs, predictions) como tensores.
+        """
+        # Pasar como diccionario si el modelo espera un input con nombre específico
+        conv_outputs, predictions = self._get_grad_model()(
+            {self.input_name: preprocessed_img}
+        )
+        
+        # Manejo de predicciones en formato lista
+        if isinstance(predictions, list):
+            predictions = predictions[0]
+        
+        return conv_outputs, predictions
     
     def _compute_gradients(self, preprocessed_img, predicted_class):
         """
@@ -49,25 +101,9 @@ class GradCAMGenerator:
                 - conv_outputs (np.ndarray): Salidas de la última capa convolucional.
                 - grads (np.ndarray): Gradientes respecto a la clase.
         """
-        # Crear modelo de gradientes
-        grad_model = tf.keras.models.Model(
-            inputs=self.model.input,
-            outputs=[
-                self.model.get_layer("conv10_thisone").output,
-                self.model.output
-            ]
-        )
-        
         # Calcular gradientes usando GradientTape
         with tf.GradientTape() as tape:
-            # Pasar como diccionario si el modelo espera un input con nombre específico
-            conv_outputs, predictions = grad_model(
-                {self.input_name: preprocessed_img}
-            )
-            
-            # Manejo de predicciones en formato lista
-            if isinstance(predictions, list):
-                predictions = predictions[0]
+            conv_outputs, predictions = self._forward(preprocessed_img)
             
             # Calcular pérdida para la clase predicha
             loss = predictions[:, predicted_class]
@@ -77,6 +113,30 @@ class GradCAMGenerator:
         
         return conv_outputs, grads
     
+    def _compute_all_gradients(self, preprocessed_img):
+        """
+        Calcula los gradientes de todas las clases en una sola pasada.
+        
+        Usa una única pasada hacia adelante y un Jacobiano por lotes
+        (vectorizado con pfor) en lugar de una cinta por clase.
+        
+        Args:
+            preprocessed_img (np.ndarray): Imagen preprocesada con shape (1, 512, 512, 1).
+            
+        Returns:
+            tuple: (conv_outputs, predictions, grads) donde:
+                - conv_outputs (tf.Tensor): Salidas de la última capa convolucional.
+                - predictions (tf.Tensor): Probabilidades con shape (1, n_clases).
+                - grads (tf.Tensor): Gradientes con shape (n_clases, H, W, C).
+        """
+        with tf.GradientTape() as tape:
+            conv_outputs, predictions = self._forward(preprocessed_img)
+        
+        # Jacobiano (1, n_clases, H, W, C) de cada salida respecto al mapa conv
+        grads = tape.batch_jacobian(predictions, conv_outputs)
+        
+        return conv_outputs, predictions, grads[0]
+    
     def _generate_heatmap_matrix(self, conv_outputs, grads):
         """
         Genera la matriz numérica del heatmap usando Grad-CAM.
@@ -112,7 +172,8 @@ class GradCAMGenerator:
         
         return heatmap
     
-    def _colorize_heatmap(self, heatmap_matrix):
+    @staticmethod
+    def _colorize_heatmap(heatmap_matrix, size=(512, 512)):
         """
         Coloriza una matriz de heatmap en formato BGR.
         
@@ -121,13 +182,13 @@ class GradCAMGenerator:
         
         Args:
             heatmap_matrix (np.ndarray): Matriz 2D del heatmap normalizada en [0, 1].
+            size (tuple): Tamaño de salida (ancho, alto).
             
         Returns:
             np.ndarray: Imagen coloreada en formato BGR con shape (H, W, 3).
         """
         # Redimensionar a tamaño de salida
-        heatmap_resized = cv2.resize(heatmap_matrix, 
-                                      (512, 512))
+        heatmap_resized = cv2.resize(heatmap_matrix, size)
         
         # Convertir a 8-bit [0, 255]
         heatmap_8bit = np.uint8(255 * heatmap_resized)
@@ -137,23 +198,28 @@ class GradCAMGenerator:
         
         return heatmap_colored
     
-    def _compose_visualization(self, colored_heatmap, original_array):
+    @staticmethod
+    def _compose_visualization(colored_heatmap, original_array,
+                               interpolation=cv2.INTER_LINEAR):
         """
         Superpone el heatmap coloreado sobre la imagen original.
         
-        Redimensiona la imagen original, aplica transparencia al heatmap
-        y combina ambas imágenes, retornando el resultado en formato RGB.
+        Redimensiona la imagen original al tamaño del heatmap, aplica
+        transparencia al heatmap y combina ambas imágenes, retornando el
+        resultado en formato RGB.
         
         Args:
             colored_heatmap (np.ndarray): Imagen heatmap coloreada en BGR.
             original_array (np.ndarray): Imagen original en BGR.
+            interpolation (int): Interpolación de OpenCV para la original.
             
         Returns:
             np.ndarray: Imagen compuesta en formato RGB.
         """
         # Redimensionar imagen original
-        original_resized = cv2.resize(original_array, 
-                                      (512, 512))
+        height, width = colored_heatmap.shape[:2]
+        original_resized = cv2.resize(original_array, (width, height),
+                                      interpolation=interpolation)
         
         # Aplicar factor de transparencia al heatmap
         heatmap_transparent = (colored_heatmap * 0.8).astype(np.uint8)
@@ -166,7 +232,58 @@ class GradCAMGenerator:
         
         return superimposed_rgb
     
-    def generate(self, array, predicted_class, preprocessed_img):
+    @staticmethod
+    def _to_compact_cam(heatmap_matrix, heatmap_format):
+        """Convierte la matriz [0, 1] al tipo compacto del formato pedido."""
+        if heatmap_format == "cam_float16":
+            return heatmap_matrix.astype(np.float16)
+        return np.uint8(np.round(255 * heatmap_matrix))
+    
+    def _render(self, heatmap_matrix, array, heatmap_format):
+        """Produce la salida del formato pedido a partir de la matriz Grad-CAM."""
+        if heatmap_format == "overlay":
+            colored_heatmap = self._colorize_heatmap(heatmap_matrix)
+            return self._compose_visualization(colored_heatmap, array)
+        return self._to_compact_cam(heatmap_matrix, heatmap_format)
+    
+    @staticmethod
+    def _validate_format(heatmap_format):
+        """Valida que el formato de salida sea uno de ``HEATMAP_FORMATS``."""
+        if heatmap_format not in HEATMAP_FORMATS:
+            raise ValueError(f"heatmap_format debe ser uno de {HEATMAP_FORMATS}, se recibió: {heatmap_format}")
+    
+    @staticmethod
+    def compose_overlay(cam, array, size=(512, 512)):
+        """
+        Colorea un CAM compacto y lo superpone a la imagen al tamaño pedido.
+        
+        Permite diferir el costo de colorear y mezclar hasta que alguien
+        realmente visualiza el estudio, y hacerlo directamente a la
+        resolución de destino (p. ej. 250x250 en la GUI).
+        
+        Args:
+            cam (np.ndarray): CAM en uint8 [0, 255] o flotante [0, 1].
+            array (np.ndarray): Imagen original en formato BGR.
+            size (tuple): Tamaño de salida (ancho, alto).
+            
+        Returns:
+            np.ndarray: Imagen compuesta en formato RGB con shape (alto, ancho, 3).
+        """
+        cam = np.asarray(cam)
+        if cam.dtype == np.uint8:
+            heatmap_matrix = cam.astype(np.float32) / 255.0
+        else:
+            heatmap_matrix = cam.astype(np.float32)
+        
+        # A 512x512 se replica exactamente el formato "overlay"; si se reduce
+        # cualquiera de los ejes, INTER_AREA evita aliasing al reducir la placa
+        preview = size[0] < 512 or size[1] < 512
+        interpolation = cv2.INTER_AREA if preview else cv2.INTER_LINEAR
+        
+        colored_heatmap = GradCAMGenerator._colorize_heatmap(heatmap_matrix, size)
+        return GradCAMGenerator._compose_visualization(colored_heatmap, array, interpolation)
+    
+    def generate(self, array, predicted_class, preprocessed_img, heatmap_format="overlay"):
         """
         Genera el mapa de calor Grad-CAM para una imagen y clase predicha.
         
@@ -177,12 +294,17 @@ class GradCAMGenerator:
             array (np.ndarray): Imagen de entrada en formato BGR.
             predicted_class (int): Índice de la clase para visualizar.
             preprocessed_img (np.ndarray): Imagen preprocesada con shape (1, 512, 512, 1).
+            heatmap_format (str): ``"overlay"`` (por defecto), ``"cam"`` o
+                ``"cam_float16"`` (ver ``HEATMAP_FORMATS``).
             
         Returns:
-            np.ndarray: Imagen con heatmap superpuesto en formato RGB con shape (512, 512, 3).
+            np.ndarray: Imagen con heatmap superpuesto en formato RGB con shape
+                (512, 512, 3), o el CAM de baja resolución (H, W) en los
+                formatos compactos.
             
         Raises:
-            ValueError: Si predicted_class no es un entero válido.
+            ValueError: Si predicted_class no es un entero válido o el
+                formato no es soportado.
         """
         # Validar entrada
         try:
@@ -191,13 +313,52 @@ class GradCAMGenerator:
             raise ValueError(f"la clase predicha debe ser un entero, se recibió: {type(predicted_class)}")
         if preprocessed_img.shape != (1, 512, 512, 1):
             raise ValueError(f"preprocessed_img debe tener shape (1, 512, 512, 1), se recibió: {preprocessed_img.shape}")
+        self._validate_format(heatmap_format)
         
         # Calcular gradientes
-        conv_outputs, grads = self._compute_gradients(preprocessed_img, predicted_class)
+        with tf.profiler.experimental.Trace("GradCAMGenerator._compute_gradients"):
+            conv_outputs, grads = self._compute_gradients(preprocessed_img, predicted_class)
         
         # Generar visualización Grad-CAM en pasos secuenciales
         heatmap_matrix = self._generate_heatmap_matrix(conv_outputs, grads)
-        colored_heatmap = self._colorize_heatmap(heatmap_matrix)
-        visualization = self._compose_visualization(colored_heatmap, array)
         
-        return visualization
+        return self._render(heatmap_matrix, array, heatmap_format)
+    
+    def generate_all(self, array, preprocessed_img, heatmap_format="overlay"):
+        """
+        Genera el mapa de calor Grad-CAM de todas las clases a la vez.
+        
+        Comparte una sola pasada hacia adelante y un único cálculo de
+        gradientes entre todas las clases, por lo que es más barato que
+        llamar a ``generate`` una vez por clase.
+        
+        Args:
+            array (np.ndarray): Imagen de entrada en formato BGR.
+            preprocessed_img (np.ndarray): Imagen preprocesada con shape (1, 512, 512, 1).
+            heatmap_format (str): Formato de salida (ver ``generate``).
+            
+        Returns:
+            tuple: (predictions, visualizations) donde:
+                - predictions (np.ndarray): Probabilidades por clase con shape (n_clases,).
+                - visualizations (dict): Índice de clase -> salida en el
+                  formato pedido.
+            
+        Raises:
+            ValueError: Si preprocessed_img no tiene la forma esperada o el
+                formato no es soportado.
+        """
+        if preprocessed_img.shape != (1, 512, 512, 1):
+            raise ValueError(f"preprocessed_img debe tener shape (1, 512, 512, 1), se recibió: {preprocessed_img.shape}")
+        self._validate_format(heatmap_format)
+        
+        with tf.profiler.experimental.Trace("GradCAMGenerator._compute_all_gradients"):
+            conv_outputs, predictions, grads = self._compute_all_gradients(preprocessed_img)
+        
+        visualizations = {}
+        for class_idx in range(grads.shape[0]):
+            heatmap_matrix = self._generate_heatmap_matrix(
+                conv_outputs, grads[class_idx:class_idx + 1]
+            )
+            visualizations[class_idx] = self._render(heatmap_matrix, array, heatmap_format)
+        
+        return predictions[0].numpy(), visualizations
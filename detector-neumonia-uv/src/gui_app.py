@@ -1,6 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, font, filedialog, messagebox
 import csv
+import queue
+import threading
 from PIL import ImageTk, Image
 import tkcap
 from integrator import PneumoniaIntegrator
@@ -32,6 +34,9 @@ class PneumoniaDetectionApp:
         self.report_id = 0
         self.img1_ref = None
         self.img2_ref = None
+        # Identificador de la carga vigente y sondeo pendiente de esa carga
+        self._load_token = 0
+        self._poll_after_id = None
 
         self._setup_ui()
         self.root.mainloop()
@@ -81,10 +86,12 @@ class PneumoniaDetectionApp:
         )
         self.btn_predict.place(x=220, y=460)
 
-        ttk.Button(self.root, text="Cargar Imagen", command=self.load_image).place(x=70, y=460)
+        self.btn_load = ttk.Button(self.root, text="Cargar Imagen", command=self.load_image)
+        self.btn_load.place(x=70, y=460)
         ttk.Button(self.root, text="Guardar", command=self.save_csv).place(x=370, y=460)
         ttk.Button(self.root, text="PDF", command=self.generate_pdf).place(x=520, y=460)
-        ttk.Button(self.root, text="Borrar", command=self.clear_fields).place(x=670, y=460)
+        self.btn_clear = ttk.Button(self.root, text="Borrar", command=self.clear_fields)
+        self.btn_clear.place(x=670, y=460)
     
     def load_image(self):
         """Carga imagen usando el integrador."""
@@ -94,30 +101,93 @@ class PneumoniaDetectionApp:
         )
         
         if filepath:
-            try:
-                self.integrator.load_and_prepare_image(filepath)
-                img_resized = self.integrator.get_loaded_image().resize((250, 250), Image.LANCZOS)
-                self.img1_ref = ImageTk.PhotoImage(img_resized)
-                
-                self.txt_img_orig.delete("1.0", tk.END)
-                self.txt_img_orig.image_create(tk.END, image=self.img1_ref)
-                self.btn_predict["state"] = "normal"
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"No se pudo cargar: {e}")
+            # La decodificación y la pirámide de vista previa se generan fuera
+            # del hilo de Tk para no congelar la ventana con DICOM grandes.
+            # "Borrar" se deshabilita para que reset() no compita con el worker.
+            self._cancel_poll()
+            self._load_token += 1
+            self.btn_load["state"] = "disabled"
+            self.btn_predict["state"] = "disabled"
+            self.btn_clear["state"] = "disabled"
+            # Los niveles de vista previa llegan por la cola apenas están
+            # listos, mientras el worker sigue con la normalización
+            previews = queue.Queue()
+            outcome = {}
+            
+            def worker():
+                try:
+                    self.integrator.load_and_prepare_image(filepath, on_preview=previews.put)
+                except Exception as e:
+                    outcome["error"] = e
+            
+            thread = threading.Thread(target=worker, daemon=True)
+            thread.start()
+            self._poll_load(thread, previews, outcome, self._load_token)
+    
+    def _poll_load(self, thread, previews, outcome, token):
+        """
+        Muestra los niveles de vista previa a medida que llegan y espera sin
+        bloquear a que termine la carga.
+        
+        Los resultados de una carga anterior (tras "Borrar" u otra carga)
+        se descartan.
+        """
+        self._poll_after_id = None
+        if token != self._load_token:
+            return
+        
+        level = None
+        while not previews.empty():
+            level = previews.get_nowait()
+        if level is not None:
+            self._show_preview(level)
+        
+        if thread.is_alive():
+            self._poll_after_id = self.root.after(
+                30, self._poll_load, thread, previews, outcome, token
+            )
+            return
+        
+        self.btn_load["state"] = "normal"
+        self.btn_clear["state"] = "normal"
+        if "error" in outcome:
+            messagebox.showerror("Error", f"No se pudo cargar: {outcome['error']}")
+            return
+        
+        self.btn_predict["state"] = "normal"
+    
+    def _show_preview(self, img):
+        """
+        Muestra un nivel de la vista previa en el panel de la radiografía.
+        
+        Los niveles gruesos son de pocas decenas de píxeles, así que
+        ampliarlos con NEAREST en el hilo de Tk es inmediato.
+        """
+        if img.size != (250, 250):
+            img = img.resize((250, 250), Image.NEAREST)
+        self.img1_ref = ImageTk.PhotoImage(img)
+        
+        self.txt_img_orig.delete("1.0", tk.END)
+        self.txt_img_orig.image_create(tk.END, image=self.img1_ref)
+    
+    def _cancel_poll(self):
+        """Cancela el sondeo pendiente de la carga en curso, si lo hay."""
+        if self._poll_after_id is not None:
+            self.root.after_cancel(self._poll_after_id)
+            self._poll_after_id = None
 
     def run_prediction(self):
         """Ejecuta predicción usando el integrador."""
         try:
-            # Obtener todo del integrador
-            result = self.integrator.analyze_image()
+            # Obtener todo del integrador (CAM compacto, se compone al mostrar)
+            result = self.integrator.analyze_image(heatmap_format="cam")
             
             label = result['label']
             probability = result['probability']
-            heatmap = result['heatmap']
+            heatmap = self.integrator.render_heatmap(result['heatmap'], size=(250, 250))
             
             # Mostrar heatmap
-            img_heat = Image.fromarray(heatmap).resize((250, 250), Image.LANCZOS)
+            img_heat = Image.fromarray(heatmap)
             self.img2_ref = ImageTk.PhotoImage(img_heat)
             
             self.txt_img_heat.delete("1.0", tk.END)
@@ -165,6 +235,10 @@ class PneumoniaDetectionApp:
     def clear_fields(self):
         """Limpia la interfaz y el estado."""
         if messagebox.askokcancel("Confirmación", "Se borrarán todos los datos."):
+            # Invalidar la carga vigente y su sondeo pendiente
+            self._cancel_poll()
+            self._load_token += 1
+            
             # Limpiar integrador
             self.integrator.reset()
             
@@ -2,55 +2,202 @@
 Módulo integrador que coordina la carga, preprocesamiento y predicción.
 """
 
-from read_img import ImageLoader
+import hashlib
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+import numpy as np
+
+from read_img import ImageLoader, source_name
+from read_study import StudyLoader
 from predictor import Predictor
+from profiling import RequestProfiler
+from admission import AdmissionController, estimate_decode_footprint, estimate_frame_footprint
+from grad_cam import GradCAMGenerator
+from export import ColumnarResultWriter
+
+
+def _timed(iterable):
+    """Genera (elemento, milisegundos que tomó producirlo)."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        yield item, (time.perf_counter() - start) * 1000
+
+
+def _image_hash(pixels):
+    """Hash BLAKE2b de 128 bits (hex) de un frame, leído sin copiar sus bytes."""
+    return hashlib.blake2b(memoryview(np.ascontiguousarray(pixels)), digest_size=16).hexdigest()
 
 
 class PneumoniaIntegrator:
     """
     Coordinador que unifica carga de imagen y predicción.
     Retorna label, probabilidad y heatmap de forma unificada.
+
+    ``analyze`` es la API por solicitud: no guarda estado en la instancia y
+    puede llamarse desde varios hilos compartiendo un mismo ``Predictor``.
+    ``load_and_prepare_image``/``analyze_image`` mantienen la imagen
+    cargada entre llamadas y son para la GUI (una sesión por instancia).
     """
     
-    def __init__(self):
+    def __init__(self, profile=None, admission=None, predictor=None):
         """
         Inicializa el integrador cargando el modelo y el predictor.
+
+        Args:
+            profile: Modo de perfilado por defecto (None, True, "cprofile"
+                o "tf"). Si es None se toma de la variable de entorno
+                ``NEUMONIA_PROFILE``.
+            admission (AdmissionController): Control de admisión por
+                memoria. Si es None se crea desde ``NEUMONIA_MEMORY_BUDGET_MB``
+                (sin límite si no está definida).
+            predictor (Predictor): Predictor ya cargado para compartir el
+                modelo entre integradores; si es None se carga uno nuevo.
         """
-        self.predictor = Predictor()
+        self.predictor = predictor or Predictor()
+        self.profiler = (
+            RequestProfiler.from_env() if profile is None else RequestProfiler(profile)
+        )
+        self.admission = (
+            AdmissionController.from_env() if admission is None else admission
+        )
         self.current_array = None
+        self.preview_pyramid = None
+        self.request_id = None
+        self._loader = None
+        self._reserved_bytes = 0
     
-    def load_and_prepare_image(self, filepath):
+    def load_and_prepare_image(self, filepath, profile=None, on_preview=None):
         """
         Carga imagen desde archivo y la prepara para visualización.
         
         Args:
-            filepath: Ruta del archivo (DICOM, JPG, PNG).
+            filepath: Ruta del archivo DICOM o su contenido en memoria.
+            profile: Opción de perfilado para esta llamada; None usa el
+                modo del integrador.
+            on_preview (callable): Recibe cada nivel de la vista previa
+                apenas está listo, antes de la normalización (ver
+                ``ImageLoader``).
             
         Returns:
             tuple: (img_array_RGB, img_PIL_for_display)
+
+        Raises:
+            MemoryBudgetError: Si la imagen no cabe en el presupuesto de memoria.
         """
-        loader = ImageLoader(filepath)
-        self.current_array = loader.get_img_RGB()
-        self.img_to_show = loader.get_img_to_show()
+        # La imagen anterior se descarta, así que su reserva se libera
+        self.reset()
+        self._reserve(filepath)
+
+        self.request_id = RequestProfiler.new_request_id(source_name(filepath, None))
+        try:
+            with self.profiler.profile(self.request_id, "load", profile):
+                loader = ImageLoader(filepath, on_preview=on_preview)
+                self.current_array = loader.get_img_RGB()
+                self.preview_pyramid = loader.get_preview_pyramid()
+                self._loader = loader
+        except Exception:
+            self.reset()
+            raise
         
-    def analyze_image(self):
+    def analyze_image(self, profile=None, all_classes=False, heatmap_format="overlay"):
         """
         Ejecuta predicción y genera heatmap.
         
         Args:
-            img_array: numpy array (opcional, usa el último cargado si es None).
+            profile: Opción de perfilado para esta llamada; None usa el
+                modo del integrador.
+            all_classes (bool): Si es True, genera además el heatmap de
+                cada clase en una sola pasada.
+            heatmap_format (str): "overlay" (RGB 512x512) o un CAM compacto
+                "cam"/"cam_float16" para componer después con
+                ``render_heatmap``.
             
         Returns:
             dict: {
                 'label': str,           # 'bacteriana', 'normal', 'viral'
                 'probability': float,   # ej: 94.25
-                'heatmap': ndarray      # RGB (512, 512, 3)
+                'heatmap': ndarray,     # RGB (512, 512, 3) o CAM compacto
+                'heatmaps': dict        # solo con all_classes: etiqueta -> heatmap
             }
         """
         if self.current_array is None:
             raise ValueError("No hay imagen cargada.")
         
-        label, probability, heatmap = self.predictor.predict(self.current_array)
+        with self.profiler.profile(self.request_id, "analyze", profile):
+            return self._analyze_array(self.current_array, all_classes, heatmap_format)
+    
+    def render_heatmap(self, cam, size=(512, 512), array=None):
+        """
+        Colorea y superpone un CAM compacto al tamaño que necesite el consumidor.
+        
+        Args:
+            cam (np.ndarray): Heatmap en formato "cam" o "cam_float16".
+            size (tuple): Tamaño de salida (ancho, alto).
+            array (np.ndarray): Imagen original; por defecto la imagen cargada.
+            
+        Returns:
+            np.ndarray: Imagen RGB con el heatmap superpuesto.
+        """
+        if array is None:
+            array = self.current_array
+        if array is None:
+            raise ValueError("No hay imagen cargada.")
+        return GradCAMGenerator.compose_overlay(cam, array, size)
+    
+    def analyze(self, source, all_classes=False, profile=None, heatmap_format="overlay"):
+        """
+        Carga y analiza una imagen en una sola llamada sin estado compartido.
+        
+        Todo el estado de la solicitud vive en variables locales, por lo
+        que varios hilos pueden llamar a este método a la vez sobre la
+        misma instancia (y el mismo modelo).
+        
+        Args:
+            source: Ruta del archivo DICOM o su contenido en memoria
+                (``bytes``, ``memoryview`` u objeto tipo archivo).
+            all_classes (bool): Si es True, genera el heatmap de cada clase.
+            profile: Opción de perfilado para esta llamada; None usa el
+                modo del integrador.
+            heatmap_format (str): Formato del heatmap (ver ``analyze_image``).
+            
+        Returns:
+            dict: Igual que ``analyze_image``.
+
+        Raises:
+            MemoryBudgetError: Si la imagen no cabe en el presupuesto de memoria.
+        """
+        admission = nullcontext()
+        if self.admission is not None:
+            admission = self.admission.admit(estimate_decode_footprint(source))
+        
+        request_id = RequestProfiler.new_request_id(source_name(source, None))
+        with admission, self.profiler.profile(request_id, "request", profile):
+            array = ImageLoader(source, preview=False).get_img_RGB()
+            return self._analyze_array(array, all_classes, heatmap_format)
+    
+    def _analyze_array(self, array, all_classes=False, heatmap_format="overlay"):
+        """Ejecuta la predicción sobre un array ya cargado (sin tocar ``self``)."""
+        if all_classes:
+            label, probability, heatmaps = self.predictor.predict_all_classes(
+                array, heatmap_format
+            )
+        else:
+            label, probability, heatmap = self.predictor.predict(array, heatmap_format)
+        
+        if all_classes:
+            return {
+                'label': label,
+                'probability': probability,
+                'heatmap': heatmaps[label],
+                'heatmaps': heatmaps
+            }
         
         return {
             'label': label,
@@ -58,10 +205,209 @@ class PneumoniaIntegrator:
             'heatmap': heatmap
         }
     
+    def iter_study_results(self, source, batch_size=8, with_heatmap=False,
+                           heatmap_format="overlay", with_hash=False):
+        """
+        Analiza un estudio frame a frame en lotes.
+
+        Los frames se leen de forma perezosa y se agrupan en lotes de
+        ``batch_size`` para la inferencia, así solo un lote está en
+        memoria a la vez.
+
+        Con control de admisión se reserva la decodificación de un frame
+        más la copia RGB de los demás frames del lote. El lote nunca supera
+        los frames del estudio y, si no cabe en el presupuesto, se reduce
+        antes de rechazar el estudio.
+        La estimación lee el header de cada archivo del estudio antes del
+        primer resultado (solo headers, sin píxeles).
+
+        Args:
+            source: Directorio, archivo DICOM (uno o varios frames) o
+                lista de rutas.
+            batch_size (int): Cantidad de frames por inferencia.
+            with_heatmap (bool): Si es True, incluye el heatmap de cada frame.
+            heatmap_format (str): Formato del heatmap; "cam" reduce mucho el
+                tamaño de los resultados en corridas por lotes.
+            with_hash (bool): Si es True, calcula el hash de cada frame
+                (lo usa ``export_results``); si no, 'image_hash' es None.
+
+        Yields:
+            dict: {
+                'source': str,              # archivo de origen
+                'frame': int,               # índice del frame en el archivo
+                'label': str,
+                'probability': float,
+                'probabilities': ndarray,   # probabilidad por clase
+                'heatmap': ndarray | None,
+                'label_idx': int,           # índice en label_map
+                'image_hash': str | None,   # BLAKE2b del frame DICOM original
+                'timings': {
+                    'load_ms': float,       # lectura, hash y normalización del frame
+                    'inference_ms': float   # parte del lote que le corresponde
+                }
+            }
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size debe ser mayor o igual a 1.")
+
+        study = StudyLoader(source)
+
+        # Solo un frame se decodifica a la vez; los demás del lote
+        # conservan únicamente su copia RGB
+        reservation = 0
+        if self.admission is not None:
+            footprints = [estimate_frame_footprint(path) for path in study.files]
+            decode_bytes = max(decode for decode, _, _ in footprints)
+            retained_bytes = max(retained for _, retained, _ in footprints)
+            batch_size = min(batch_size, sum(frames for _, _, frames in footprints))
+            spare = self.admission.budget_bytes - decode_bytes
+            if spare >= 0 and retained_bytes:
+                batch_size = max(1, min(batch_size, 1 + spare // retained_bytes))
+            reservation = decode_bytes + (batch_size - 1) * retained_bytes
+            self.admission.acquire(reservation)
+
+        def prepared_frames():
+            # El hash se toma del frame original de un canal, antes de
+            # normalizar, para no retenerlo hasta que se complete el lote
+            for name, frame_index, pixels in study.iter_pixel_frames():
+                image_hash = _image_hash(pixels) if with_hash else None
+                yield name, frame_index, ImageLoader.to_RGB(pixels), image_hash
+
+        try:
+            frames = _timed(prepared_frames())
+            while True:
+                batch = list(islice(frames, batch_size))
+                if not batch:
+                    break
+
+                start = time.perf_counter()
+                predictions = self.predictor.predict_batch(
+                    [img_RGB for (_, _, img_RGB, _), _ in batch],
+                    with_heatmap=with_heatmap, heatmap_format=heatmap_format
+                )
+                inference_ms = (time.perf_counter() - start) * 1000 / len(batch)
+
+                for ((path, frame_index, _, image_hash), load_ms), prediction in zip(batch, predictions):
+                    label, probability, probabilities, heatmap = prediction
+                    yield {
+                        'source': path,
+                        'frame': frame_index,
+                        'label': label,
+                        'probability': probability,
+                        'probabilities': probabilities,
+                        'heatmap': heatmap,
+                        'label_idx': int(np.argmax(probabilities)),
+                        'image_hash': image_hash,
+                        'timings': {
+                            'load_ms': load_ms,
+                            'inference_ms': inference_ms
+                        }
+                    }
+        finally:
+            if reservation:
+                self.admission.release(reservation)
+
+    def analyze_study(self, source, batch_size=8, with_heatmap=False, profile=None,
+                      heatmap_format="overlay"):
+        """
+        Analiza un estudio completo y agrega el resultado.
+
+        El resultado del estudio promedia las probabilidades por clase de
+        todos los frames y toma la clase de mayor probabilidad media.
+
+        Args:
+            source: Directorio, archivo DICOM (uno o varios frames) o
+                lista de rutas.
+            batch_size (int): Cantidad de frames por inferencia.
+            with_heatmap (bool): Si es True, incluye el heatmap de cada frame.
+            profile: Opción de perfilado para esta llamada; None usa el
+                modo del integrador.
+            heatmap_format (str): Formato del heatmap de cada frame.
+
+        Returns:
+            dict: {
+                'frames': list,   # resultados por frame (ver iter_study_results)
+                'study': {
+                    'label': str,
+                    'probability': float,
+                    'probabilities': ndarray,
+                    'n_frames': int
+                }
+            }
+        """
+        frames = []
+        probability_sum = None
+        request_id = RequestProfiler.new_request_id(
+            source_name(source, None) if not isinstance(source, (list, tuple)) else None
+        )
+        with self.profiler.profile(request_id, "study", profile):
+            for result in self.iter_study_results(
+                source, batch_size, with_heatmap, heatmap_format
+            ):
+                frames.append(result)
+                if probability_sum is None:
+                    probability_sum = np.zeros_like(result['probabilities'], dtype=float)
+                probability_sum += result['probabilities']
+
+        if not frames:
+            raise ValueError("El estudio no contiene frames.")
+
+        mean_probabilities = probability_sum / len(frames)
+        study_idx = int(np.argmax(mean_probabilities))
+
+        return {
+            'frames': frames,
+            'study': {
+                'label': self.predictor.label_map.get(study_idx, "desconocida"),
+                'probability': float(mean_probabilities[study_idx] * 100),
+                'probabilities': mean_probabilities,
+                'n_frames': len(frames)
+            }
+        }
+
+    def export_results(self, source, path, batch_size=8, chunk_size=4096):
+        """
+        Analiza un estudio o lote y exporta los resultados a un ``.npy`` columnar.
+
+        Los resultados se escriben por bloques a medida que se producen,
+        sin acumularlos en memoria ni formatearlos como texto.
+
+        Args:
+            source: Directorio, archivo DICOM o lista de entradas.
+            path (str): Ruta del archivo ``.npy`` de salida.
+            batch_size (int): Cantidad de frames por inferencia.
+            chunk_size (int): Filas por bloque escrito.
+
+        Returns:
+            int: Cantidad de filas exportadas.
+        """
+        labels = [self.predictor.label_map[idx] for idx in sorted(self.predictor.label_map)]
+        with ColumnarResultWriter(path, labels, chunk_size) as writer:
+            return writer.extend(
+                self.iter_study_results(source, batch_size, with_hash=True)
+            )
+
+    def _reserve(self, filepath):
+        """Reserva la memoria estimada de la imagen si hay control de admisión."""
+        if self.admission is not None:
+            nbytes = estimate_decode_footprint(filepath)
+            self.admission.acquire(nbytes)
+            self._reserved_bytes = nbytes
+
     def reset(self):
-        """Limpia el array almacenado."""
+        """Limpia el array almacenado y libera su reserva de memoria."""
         self.current_array = None
+        self.preview_pyramid = None
+        self.request_id = None
+        self._loader = None
+        if self._reserved_bytes:
+            self.admission.release(self._reserved_bytes)
+            self._reserved_bytes = 0
 
     def get_loaded_image(self):
-        """Retorna la imagen preparada para mostrar."""
-        return self.img_to_show
+        """Retorna la imagen a resolución completa (se genera solo si se pide)."""
+        return None if self._loader is None else self._loader.get_img_to_show()
+
+    def get_preview_pyramid(self):
+        """Retorna la pirámide de vista previa (de gruesa a final) de la imagen cargada."""
+        return self.preview_pyramid
@@ -1,23 +1,31 @@
 import tensorflow as tf
 import os
 
+from runtime_config import RuntimeConfig
+
 
 class ModelLoader:
     """Carga y mantiene en memoria el modelo entrenado."""
 
-    def __init__(self, model_path="models/conv_MLP_84.h5"):
+    def __init__(self, model_path="models/conv_MLP_84.h5", runtime_config=None):
         """
         Inicializa el cargador de modelos y carga el modelo.
         
         Args:
             model_path (str): Ruta al archivo del modelo en formato .h5
+            runtime_config (RuntimeConfig): Topología de hilos a aplicar
+                antes de cargar el modelo. Si es None se toma del entorno
+                (``NEUMONIA_INTRA_OP_THREADS``, etc.).
             
         Raises:
             FileNotFoundError: Si el archivo del modelo no existe
             ValueError: Si el modelo no se puede cargar o es inválido
         """
         self.path = model_path
+        self.runtime_config = runtime_config or RuntimeConfig.from_env()
         self._validate_file_exists()
+        # Los pools de hilos de TF deben fijarse antes de crear el modelo
+        self.runtime_config.apply()
         self.model = self._load()
         self._validate_model_integrity()
 
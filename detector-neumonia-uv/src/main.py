@@ -1,4 +1,5 @@
 import argparse
+import os
 
 
 def main():
@@ -10,9 +11,37 @@ def main():
         action="store_true",
         help="Ejecuta la aplicacion por consola",
     )
+    parser.add_argument(
+        "--study",
+        metavar="RUTA",
+        help="Analiza un estudio completo (directorio o DICOM multi-frame)",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="ARCHIVO",
+        help="Con --study, exporta los resultados por frame a un .npy columnar",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "tf"],
+        help="Guarda un perfil por solicitud en reports/profiles",
+    )
     args = parser.parse_args()
 
-    if args.console:
+    if args.profile:
+        from profiling import PROFILE_ENV_VAR
+        os.environ[PROFILE_ENV_VAR] = args.profile
+
+    if args.export and not args.study:
+        parser.error("--export requiere --study")
+
+    if args.study and args.export:
+        from console_app import PneumoniaConsoleApp
+        PneumoniaConsoleApp().export_study(args.study, args.export)
+    elif args.study:
+        from console_app import PneumoniaConsoleApp
+        PneumoniaConsoleApp().run_study(args.study)
+    elif args.console:
         from console_app import PneumoniaConsoleApp
         PneumoniaConsoleApp().run()
     else:
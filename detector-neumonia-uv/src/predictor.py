@@ -1,4 +1,5 @@
 import numpy as np
+import tensorflow as tf
 
 from preprocess_img import ImagePreprocessor
 from grad_cam import GradCAMGenerator
@@ -16,6 +17,9 @@ class Predictor:
         model (tf.keras.Model): Modelo entrenado para predicción.
         grad_cam (GradCAMGenerator): Instancia de GradCAMGenerator para visualización.
         label_map (dict): Mapeo de índices a etiquetas de neumonía.
+
+    Los métodos de predicción no modifican el estado de la instancia, por
+    lo que un único Predictor puede compartirse entre hilos.
     """
 
     def __init__(self):
@@ -34,12 +38,28 @@ class Predictor:
             2: "viral"
         }
 
-    def predict(self, image_array: np.ndarray):
+    def _infer(self, batch_array_img):
+        """Ejecuta el modelo sobre un lote preprocesado.
+
+        Llama al modelo directamente en modo inferencia en lugar de usar
+        ``model.predict``, que arma un pipeline de datos por llamada y no es
+        seguro de compartir entre hilos. Así un mismo ``Predictor`` puede
+        atender solicitudes concurrentes.
+
+        Returns:
+            np.ndarray: Probabilidades con shape (N, n_clases).
+        """
+        with tf.profiler.experimental.Trace("Predictor._infer"):
+            return self.model(batch_array_img, training=False).numpy()
+
+    def predict(self, image_array: np.ndarray, heatmap_format="overlay"):
         """Realiza una predicción de neumonía para una imagen.
 
         Args:
             image_array: Array numpy con la imagen de rayos X
                 en formato (altura, ancho, canales).
+            heatmap_format: Formato del heatmap: "overlay" (RGB 512x512)
+                o un CAM compacto "cam"/"cam_float16" (ver GradCAMGenerator).
 
         Returns:
             Tupla con (etiqueta, confianza, heatmap):
@@ -58,7 +78,7 @@ class Predictor:
         batch_array_img = ImagePreprocessor.preprocess(image_array)
 
         # Realizar predicción
-        prediction_array = self.model.predict(batch_array_img, verbose=0)
+        prediction_array = self._infer(batch_array_img)
         prediction_idx = np.argmax(prediction_array)
         confidence = float(np.max(prediction_array) * 100)
 
@@ -66,6 +86,103 @@ class Predictor:
         label = self.label_map.get(prediction_idx, "desconocida")
 
         # Generar visualización Grad-CAM
-        heatmap = self.grad_cam.generate(image_array, prediction_idx, batch_array_img)
+        heatmap = self.grad_cam.generate(
+            image_array, prediction_idx, batch_array_img, heatmap_format
+        )
+
+        return (label, confidence, heatmap)
+
+    def predict_all_classes(self, image_array: np.ndarray, heatmap_format="overlay"):
+        """Realiza una predicción y genera el Grad-CAM de todas las clases.
+
+        La predicción y los mapas de calor salen de la misma pasada hacia
+        adelante, sin invocar ``model.predict`` por separado.
+
+        Args:
+            image_array: Array numpy con la imagen de rayos X
+                en formato (altura, ancho, canales).
+            heatmap_format: Formato de los heatmaps (ver ``predict``).
+
+        Returns:
+            Tupla con (etiqueta, confianza, heatmaps):
+                - etiqueta (str): Tipo predicho ("bacteriana", "normal", "viral").
+                - confianza (float): Puntuación de confianza (0-100).
+                - heatmaps (dict): Etiqueta -> visualización Grad-CAM de
+                  cada clase de ``label_map``.
 
-        return (label, confidence, heatmap)
\ No newline at end of file
+        Raises:
+            ValueError: Si image_array es None o está vacío.
+        """
+        if image_array is None or image_array.size == 0:
+            raise ValueError("image_array no puede ser None o estar vacío.")
+
+        batch_array_img = ImagePreprocessor.preprocess(image_array)
+
+        prediction_array, visualizations = self.grad_cam.generate_all(
+            image_array, batch_array_img, heatmap_format
+        )
+        prediction_idx = int(np.argmax(prediction_array))
+        confidence = float(np.max(prediction_array) * 100)
+        label = self.label_map.get(prediction_idx, "desconocida")
+
+        heatmaps = {
+            self.label_map.get(class_idx, str(class_idx)): visualization
+            for class_idx, visualization in visualizations.items()
+        }
+
+        return (label, confidence, heatmaps)
+
+    def predict_batch(self, image_arrays, with_heatmap=False, heatmap_format="overlay"):
+        """Realiza predicciones para varias imágenes en una sola inferencia.
+
+        Las imágenes se preprocesan individualmente y se apilan en un único
+        lote para ``_infer``, de modo que el costo de invocar el
+        modelo se paga una vez por lote y no por imagen.
+
+        Args:
+            image_arrays: Lista de arrays numpy en formato
+                (altura, ancho, canales).
+            with_heatmap (bool): Si es True, genera también la
+                visualización Grad-CAM de cada imagen.
+            heatmap_format: Formato de los heatmaps (ver ``predict``).
+
+        Returns:
+            Lista de tuplas (etiqueta, confianza, probabilidades, heatmap),
+            una por imagen y en el mismo orden de entrada:
+                - probabilidades (np.ndarray): Vector con la probabilidad
+                  de cada clase, indexado como ``label_map``.
+                - heatmap (np.ndarray | None): Visualización Grad-CAM o
+                  None si ``with_heatmap`` es False.
+
+        Raises:
+            ValueError: Si la lista está vacía o alguna imagen es inválida.
+        """
+        if not image_arrays:
+            raise ValueError("image_arrays no puede estar vacío.")
+        for image_array in image_arrays:
+            if image_array is None or image_array.size == 0:
+                raise ValueError("image_array no puede ser None o estar vacío.")
+
+        # Preprocesar y apilar en un solo lote (N, 512, 512, 1)
+        batch_array_img = np.concatenate(
+            [ImagePreprocessor.preprocess(image_array) for image_array in image_arrays]
+        )
+
+        prediction_array = self._infer(batch_array_img)
+
+        results = []
+        for i, probabilities in enumerate(prediction_array):
+            prediction_idx = int(np.argmax(probabilities))
+            confidence = float(np.max(probabilities) * 100)
+            label = self.label_map.get(prediction_idx, "desconocida")
+
+            heatmap = None
+            if with_heatmap:
+                heatmap = self.grad_cam.generate(
+                    image_arrays[i], prediction_idx, batch_array_img[i:i + 1],
+                    heatmap_format
+                )
+
+            results.append((label, confidence, probabilities, heatmap))
+
+        return results
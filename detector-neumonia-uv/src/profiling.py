@@ -0,0 +1,152 @@
+"""
+Módulo de perfilado bajo demanda para solicitudes individuales.
+"""
+
+import cProfile
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+
+PROFILE_ENV_VAR = "NEUMONIA_PROFILE"
+PROFILE_DIR = os.path.join("reports", "profiles")
+
+
+class RequestProfiler:
+    """
+    Captura perfiles de cProfile (y opcionalmente de TensorFlow) por solicitud.
+
+    Cada etapa perfilada genera un archivo ``<request_id>_<etapa>.prof`` en
+    ``output_dir`` que puede inspeccionarse offline con ``pstats`` o
+    herramientas como snakeviz. En modo ``"tf"`` se captura además una traza
+    del profiler de TensorFlow en ``<request_id>_<etapa>_tf/`` para
+    TensorBoard.
+
+    Solo puede haber un cProfile (y una traza de TensorFlow) activo por
+    proceso; si otra solicitud concurrente ya se está perfilando, la etapa
+    se ejecuta sin perfilar en lugar de fallar.
+
+    Attributes:
+        mode (str | None): None (desactivado), ``"cprofile"`` o ``"tf"``.
+        output_dir (str): Directorio donde se escriben los perfiles.
+    """
+
+    MODES = (None, "cprofile", "tf")
+    _active_lock = threading.Lock()
+
+    def __init__(self, mode=None, output_dir=PROFILE_DIR):
+        """
+        Inicializa el perfilador.
+
+        Args:
+            mode: Modo por defecto; acepta los mismos valores que ``resolve_mode``.
+            output_dir (str): Directorio de salida de los perfiles.
+
+        Raises:
+            ValueError: Si el modo no es válido.
+        """
+        self.mode = self.resolve_mode(mode)
+        self.output_dir = output_dir
+
+    @classmethod
+    def from_env(cls, output_dir=PROFILE_DIR):
+        """
+        Crea un perfilador a partir de la variable ``NEUMONIA_PROFILE``.
+
+        Valores: ``1``/``true``/``cprofile`` activan cProfile y ``tf`` añade
+        la traza de TensorFlow. Vacío o ``0`` lo desactiva.
+        """
+        return cls(os.environ.get(PROFILE_ENV_VAR), output_dir)
+
+    @staticmethod
+    def resolve_mode(value):
+        """
+        Normaliza una opción de perfilado al modo correspondiente.
+
+        Args:
+            value: None, bool o str (``"0"``, ``"1"``, ``"cprofile"``, ``"tf"``...).
+
+        Returns:
+            str | None: ``None``, ``"cprofile"`` o ``"tf"``.
+
+        Raises:
+            ValueError: Si el valor no es reconocido.
+        """
+        if value is None or value is False:
+            return None
+        if value is True:
+            return "cprofile"
+
+        value = str(value).strip().lower()
+        if value in ("", "0", "false", "off"):
+            return None
+        if value in ("1", "true", "on", "cprofile"):
+            return "cprofile"
+        if value == "tf":
+            return "tf"
+        raise ValueError(f"Modo de perfilado no válido: {value}")
+
+    @staticmethod
+    def new_request_id(name=None):
+        """
+        Genera un identificador único y legible para una solicitud.
+
+        Args:
+            name (str): Nombre opcional (p. ej. la ruta del archivo) que se
+                añade al identificador.
+        """
+        request_id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        if name:
+            stem = os.path.splitext(os.path.basename(str(name)))[0]
+            stem = re.sub(r"[^A-Za-z0-9_.-]", "_", stem)
+            if stem:
+                request_id = f"{request_id}_{stem}"
+        return request_id
+
+    @contextmanager
+    def profile(self, request_id, stage, mode=None):
+        """
+        Perfila el bloque ``with`` si el modo efectivo lo indica.
+
+        Args:
+            request_id (str): Identificador de la solicitud.
+            stage (str): Nombre de la etapa (p. ej. ``"load"``, ``"analyze"``).
+            mode: Opción por llamada; None usa el modo por defecto.
+
+        Yields:
+            str | None: Ruta del archivo ``.prof`` o None si está desactivado
+                u otra solicitud ya se está perfilando.
+        """
+        mode = self.mode if mode is None else self.resolve_mode(mode)
+        if mode is None or not RequestProfiler._active_lock.acquire(blocking=False):
+            yield None
+            return
+        try:
+            with self._capture(request_id, stage, mode) as profile_path:
+                yield profile_path
+        finally:
+            RequestProfiler._active_lock.release()
+
+    @contextmanager
+    def _capture(self, request_id, stage, mode):
+        """Ejecuta cProfile (y la traza de TensorFlow) y escribe los archivos."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base_path = os.path.join(self.output_dir, f"{request_id}_{stage}")
+        profile_path = f"{base_path}.prof"
+
+        tf = None
+        if mode == "tf":
+            import tensorflow as tf
+            tf.profiler.experimental.start(f"{base_path}_tf")
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profile_path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            if tf is not None:
+                tf.profiler.experimental.stop()
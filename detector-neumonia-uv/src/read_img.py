@@ -1,34 +1,158 @@
+import io
+import os
+
 import cv2
 import pydicom as dicom
 import numpy as np
 from PIL import Image
 
 
+class _BufferReader(io.RawIOBase):
+    """
+    Archivo de solo lectura sobre un buffer en memoria (bytearray, memoryview).
+
+    A diferencia de ``io.BytesIO``, no copia el buffer completo al crearse:
+    cada ``read`` copia únicamente el segmento solicitado y ``readinto``
+    lo copia directamente al buffer del llamador. Los bytes de PixelData
+    se copian una vez al decodificar, igual que con ``io.BytesIO``.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError(f"whence no válido: {whence}")
+        self._pos = max(self._pos, 0)
+        return self._pos
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        data = self._view[self._pos:end].tobytes()
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b):
+        target = memoryview(b).cast("B")
+        n = max(min(len(target), len(self._view) - self._pos), 0)
+        target[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def as_dicom_source(source):
+    """
+    Adapta una entrada DICOM a algo que ``pydicom.dcmread`` pueda leer.
+
+    Args:
+        source: Ruta (str o PathLike), ``bytes``, ``bytearray``,
+            ``memoryview`` u objeto tipo archivo con ``read``/``seek``.
+
+    Returns:
+        Ruta u objeto tipo archivo posicionado al inicio del contenido.
+
+    Raises:
+        TypeError: Si el tipo de entrada no es soportado.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if isinstance(source, bytes):
+        # BytesIO comparte el buffer de un bytes inmutable sin copiarlo
+        return io.BytesIO(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return _BufferReader(source)
+    if hasattr(source, "read") and hasattr(source, "seek"):
+        return source
+    raise TypeError(f"Tipo de entrada DICOM no soportado: {type(source).__name__}")
+
+
+def source_name(source, default="<memoria>"):
+    """
+    Retorna un nombre legible para una entrada DICOM.
+
+    Args:
+        source: Ruta, buffer u objeto tipo archivo.
+        default (str): Nombre a usar si la entrada no tiene uno.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    name = getattr(source, "name", None)
+    return name if isinstance(name, str) else default
+
+
+def _first_value(value):
+    """Primer valor de un atributo DICOM multivalor (p. ej. WindowCenter)."""
+    if isinstance(value, (list, tuple, dicom.multival.MultiValue)):
+        return value[0] if len(value) else None
+    return value
+
+
 class ImageLoader:
     """
-    Clase encargada de la carga de imágenes desde el sistema de archivos.
-    Soporta formatos DICOM y genera representaciones PIL y RGB para visualización.
+    Clase encargada de la carga de imágenes desde el sistema de archivos
+    o desde memoria. Soporta formatos DICOM y genera representaciones PIL
+    y RGB para visualización.
     
     Attributes:
         img: Objeto pydicom Dataset con los datos DICOM cargados
-        img2show: Imagen PIL para visualización directa
+        img2show: Imagen PIL para visualización directa (se genera recién
+            al pedirla)
         img_RGB: Array numpy BGR normalizado para procesamiento con OpenCV
+        preview_pyramid: Lista de imágenes PIL 8-bit de menor a mayor
+            resolución para la vista previa (None si no se generó)
     """
 
-    def __init__(self, path):
+    PREVIEW_SIZE = (250, 250)
+    PREVIEW_MIN_SIZE = 32
+
+    def __init__(self, path, preview=True, on_preview=None):
         """
         Inicializa el cargador de imágenes y procesa un archivo DICOM.
         
-        Lee el archivo DICOM especificado y genera automáticamente dos 
-        representaciones de la imagen: una para visualización (PIL) y 
-        otra normalizada en formato RGB.
+        Lee el archivo DICOM especificado y genera la imagen normalizada en
+        formato RGB. La vista previa se genera antes que la normalización,
+        así la GUI puede mostrarla mientras esta corre; la imagen PIL a
+        resolución completa solo se crea si se pide con ``get_img_to_show``.
         
         Args:
-            path (str): Ruta al archivo DICOM a cargar
+            path: Ruta al archivo DICOM, o su contenido en memoria como
+                ``bytes``/``bytearray``/``memoryview`` u objeto tipo archivo
+                (p. ej. un upload recibido por red), sin pasar por disco.
+            preview (bool): Si es True, genera también la pirámide de vista
+                previa para la GUI.
+            on_preview (callable): Opcional; recibe cada imagen PIL de vista
+                previa apenas está lista, de la más gruesa a la final.
         """
-        self.img = dicom.dcmread(path)
-        self._generate_img_to_show()
+        self.img = dicom.dcmread(as_dicom_source(path))
+        self._img2show = None
+        self.preview_pyramid = None
+        if preview:
+            self._generate_preview_pyramid(on_preview)
         self._generate_img_RGB()
+
+    @property
+    def img2show(self):
+        """Imagen PIL a resolución completa, generada en el primer acceso."""
+        if self._img2show is None:
+            self._generate_img_to_show()
+        return self._img2show
     
     def _generate_img_to_show(self):
         """
@@ -39,7 +163,7 @@ class ImageLoader:
         para visualización.
         """
         img_array = self.img.pixel_array
-        self.img2show = Image.fromarray(img_array)
+        self._img2show = Image.fromarray(img_array)
     
     def _generate_img_RGB(self):
         """
@@ -49,12 +173,96 @@ class ImageLoader:
         al rango 0-255, convierte a uint8 y transforma de escala de grises 
         a RGB de 3 canales para compatibilidad con OpenCV.
         """
-        img_array = self.img.pixel_array
+        self.img_RGB = self.to_RGB(self.img.pixel_array)
+
+    def _generate_preview_pyramid(self, on_level=None):
+        """
+        Genera la pirámide de vista previa en 8 bits.
+
+        La única pasada sobre la resolución completa es una reducción
+        ``INTER_AREA`` al tamaño de la GUI hecha en el tipo nativo (uint8 o
+        16 bits), sin copias flotantes a resolución completa. Sobre esa
+        imagen pequeña se aplica la ventana DICOM y los niveles más gruesos
+        se obtienen con ``cv2.pyrDown``.
+
+        Args:
+            on_level (callable): Si se indica, recibe primero un nivel
+                grueso obtenido por decimación (sin recorrer la resolución
+                completa) y luego el nivel final, a medida que están listos.
+        """
+        pixels = self.img.pixel_array
+
+        if on_level is not None:
+            step = max(1, min(pixels.shape[:2]) // (2 * self.PREVIEW_MIN_SIZE))
+            coarse = pixels[::step, ::step].astype(np.float32)
+            on_level(Image.fromarray(self._apply_window(coarse)))
+
+        if pixels.dtype not in (np.uint8, np.uint16, np.int16):
+            pixels = pixels.astype(np.float32)
+
+        preview = cv2.resize(pixels, self.PREVIEW_SIZE, interpolation=cv2.INTER_AREA)
+        levels = [self._apply_window(preview.astype(np.float32))]
+        while min(levels[-1].shape[:2]) // 2 >= self.PREVIEW_MIN_SIZE:
+            levels.append(cv2.pyrDown(levels[-1]))
+
+        self.preview_pyramid = [Image.fromarray(level) for level in reversed(levels)]
+        if on_level is not None:
+            on_level(self.preview_pyramid[-1])
+
+    def _apply_window(self, values):
+        """
+        Aplica la transformación de modalidad y la ventana DICOM.
+
+        Usa ``WindowCenter``/``WindowWidth`` cuando están presentes (fórmula
+        lineal de la norma DICOM); si no, normaliza por mínimo y máximo.
+        Las imágenes MONOCHROME1 se invierten para mostrarse como placa.
+
+        Args:
+            values (numpy.ndarray): Píxeles en float32.
+
+        Returns:
+            numpy.ndarray: Imagen uint8 en rango 0-255.
+        """
+        slope = _first_value(getattr(self.img, "RescaleSlope", None))
+        intercept = _first_value(getattr(self.img, "RescaleIntercept", None))
+        values = values * float(slope if slope is not None else 1.0)
+        values = values + float(intercept if intercept is not None else 0.0)
+
+        center = _first_value(getattr(self.img, "WindowCenter", None))
+        width = _first_value(getattr(self.img, "WindowWidth", None))
+        if center is not None and width is not None and float(width) > 1:
+            center, width = float(center), float(width)
+            low = center - 0.5 - (width - 1) / 2
+            values = (values - low) / (width - 1)
+        else:
+            low, high = float(values.min()), float(values.max())
+            values = (values - low) / (high - low) if high > low else np.zeros_like(values)
+
+        values = np.clip(values, 0.0, 1.0)
+        if getattr(self.img, "PhotometricInterpretation", None) == "MONOCHROME1":
+            values = 1.0 - values
+
+        return np.uint8(np.round(values * 255))
+
+    @staticmethod
+    def to_RGB(img_array):
+        """
+        Normaliza un frame 2-D de píxeles y lo convierte a 3 canales.
+
+        Compartido por la carga de un solo archivo y por la lectura de
+        estudios multi-frame, de modo que ambos caminos producen la misma
+        entrada para el preprocesamiento.
+
+        Args:
+            img_array (numpy.ndarray): Frame 2-D en escala de grises.
+
+        Returns:
+            numpy.ndarray: Array uint8 de 3 canales con rango 0-255.
+        """
         img2 = img_array.astype(float)
         img2 = (np.maximum(img2, 0) / img2.max()) * 255.0
         img2 = np.uint8(img2)
-        img_RGB = cv2.cvtColor(img2, cv2.COLOR_GRAY2RGB)
-        self.img_RGB = img_RGB
+        return cv2.cvtColor(img2, cv2.COLOR_GRAY2RGB)
     
     def get_img_RGB(self):
         """
@@ -76,3 +284,13 @@ class ImageLoader:
                       como matplotlib o Tkinter
         """
         return self.img2show
+
+    def get_preview_pyramid(self):
+        """
+        Obtiene la pirámide de vista previa.
+
+        Returns:
+            list: Imágenes PIL 8-bit ordenadas de la más gruesa a la final
+                (``PREVIEW_SIZE``), o None si se cargó con ``preview=False``.
+        """
+        return self.preview_pyramid
@@ -0,0 +1,111 @@
+"""
+Módulo de lectura de estudios completos (varias vistas o DICOM multi-frame).
+"""
+
+import os
+
+import pydicom as dicom
+from pydicom.errors import InvalidDicomError
+from pydicom.pixels import iter_pixels
+
+from read_img import ImageLoader, as_dicom_source, source_name
+
+
+class StudyLoader:
+    """
+    Recorre los frames de un estudio de forma perezosa.
+
+    Un estudio puede ser un directorio con archivos DICOM, una lista de
+    rutas o un único archivo (de uno o varios frames). Los frames se
+    decodifican uno a uno bajo demanda, por lo que el estudio completo
+    nunca se mantiene en memoria.
+
+    Attributes:
+        files (list): Archivos que componen el estudio (rutas o entradas
+            en memoria aceptadas por ``ImageLoader``).
+    """
+
+    def __init__(self, source):
+        """
+        Inicializa el lector resolviendo los archivos del estudio.
+
+        Args:
+            source: Directorio, ruta de un archivo DICOM, un DICOM en
+                memoria (bytes o tipo archivo) o lista de cualquiera de ellos.
+
+        Raises:
+            FileNotFoundError: Si la ruta no existe.
+            ValueError: Si el estudio no contiene imágenes DICOM.
+        """
+        self.files = self._resolve_files(source)
+        if not self.files:
+            raise ValueError(f"El estudio no contiene imágenes DICOM: {source}")
+
+    @staticmethod
+    def _resolve_files(source):
+        """Convierte la entrada en una lista ordenada de archivos."""
+        if isinstance(source, (list, tuple)):
+            return list(source)
+        if not isinstance(source, (str, os.PathLike)):
+            return [source]
+        if os.path.isdir(source):
+            paths = sorted(
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if os.path.isfile(os.path.join(source, name))
+            )
+            return [path for path in paths if StudyLoader._is_dicom_image(path)]
+        if os.path.isfile(source):
+            return [source]
+        raise FileNotFoundError(f"Estudio no encontrado en: {source}")
+
+    @staticmethod
+    def _is_dicom_image(path):
+        """
+        Indica si un archivo del directorio es un DICOM con datos de imagen.
+
+        Solo se lee el encabezado, así que archivos ajenos al estudio
+        (``DICOMDIR``, notas, ``.DS_Store``...) se descartan sin decodificar
+        píxeles.
+        """
+        try:
+            header = dicom.dcmread(path, stop_before_pixels=True, specific_tags=["Rows"])
+        except (InvalidDicomError, OSError, EOFError):
+            return False
+        return "Rows" in header and header.file_meta.get("TransferSyntaxUID") is not None
+
+    @staticmethod
+    def _iter_file_pixels(path):
+        """
+        Genera los frames 2-D de un archivo DICOM.
+
+        ``iter_pixels`` (pydicom >= 3) decodifica los frames de a uno, así
+        un multi-frame nunca se decodifica completo en memoria.
+        """
+        yield from iter_pixels(as_dicom_source(path))
+
+    def iter_pixel_frames(self):
+        """
+        Genera los frames del estudio tal como vienen del DICOM.
+
+        Yields:
+            tuple: (source, frame_index, pixels) donde ``source`` es la ruta
+                (o un nombre ``<memoria:i>`` para entradas en memoria) y
+                ``pixels`` el frame 2-D sin normalizar.
+        """
+        for file_index, path in enumerate(self.files):
+            name = source_name(path, f"<memoria:{file_index}>")
+            for frame_index, pixels in enumerate(self._iter_file_pixels(path)):
+                yield name, frame_index, pixels
+
+    def iter_frames(self):
+        """
+        Genera los frames del estudio listos para preprocesar.
+
+        Yields:
+            tuple: (source, frame_index, img_RGB) donde ``img_RGB`` es el
+                frame normalizado con ``ImageLoader.to_RGB`` (ver
+                ``iter_pixel_frames``).
+        """
+        for name, frame_index, pixels in self.iter_pixel_frames():
+            yield name, frame_index, ImageLoader.to_RGB(pixels)
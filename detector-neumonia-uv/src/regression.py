@@ -0,0 +1,366 @@
+"""
+Arnés de regresión contra salidas de referencia para las rutas optimizadas.
+
+Genera un conjunto fijo de DICOM sintéticos, los pasa por la ruta de
+referencia (``model.predict`` + ``GradCAMGenerator.generate`` imagen por
+imagen, como la implementación original) y por cada modo alternativo, e
+informa la diferencia máxima de probabilidad, la concordancia de etiquetas
+y la correlación de los CAM contra tolerancias fijas.
+
+Los heatmaps se comparan como grillas CAM crudas (``"cam_float16"``) y no
+como overlays RGB: el fondo de la placa, común a ambos overlays, ocultaría
+diferencias reales entre los CAM.
+
+Uso (desde detector-neumonia-uv/):
+
+    uv run python src/regression.py --images 8
+"""
+
+import argparse
+import io
+import sys
+
+import numpy as np
+import pydicom as dicom
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage
+
+from read_img import ImageLoader
+from preprocess_img import ImagePreprocessor
+
+
+HEATMAP_FORMAT = "cam_float16"
+
+DEFAULT_TOLERANCES = {
+    "max_prob_delta": 1e-4,          # en probabilidad (0-1)
+    "label_agreement": 1.0,          # fracción mínima de etiquetas iguales
+    "min_heatmap_correlation": 0.99  # Pearson mínimo entre grillas CAM
+}
+
+
+def make_synthetic_dicom(seed, rows=None, cols=None):
+    """
+    Genera un DICOM sintético de 16 bits, determinista para cada semilla.
+
+    La imagen imita una placa de tórax (fondo con gradiente, dos campos
+    pulmonares más oscuros, opacidades y ruido) y su tamaño varía con la
+    semilla para ejercitar el redimensionamiento.
+
+    Args:
+        seed (int): Semilla del generador.
+        rows (int): Alto; por defecto se deriva de la semilla.
+        cols (int): Ancho; por defecto se deriva de la semilla.
+
+    Returns:
+        bytes: Contenido del archivo DICOM.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rows or int(rng.integers(384, 768))
+    cols = cols or int(rng.integers(384, 768))
+
+    y, x = np.mgrid[0:rows, 0:cols].astype(np.float64)
+    y /= rows
+    x /= cols
+
+    image = 1800 + 1200 * y
+    for center_x in (0.3, 0.7):
+        lung = ((x - center_x) / 0.16) ** 2 + ((y - 0.5) / 0.32) ** 2 < 1
+        image[lung] -= 900
+    for _ in range(int(rng.integers(1, 4))):
+        cx, cy = rng.uniform(0.2, 0.8, size=2)
+        radius = rng.uniform(0.03, 0.08)
+        image += 700 * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (2 * radius ** 2))
+    image += rng.normal(0, 40, size=image.shape)
+    pixels = np.clip(image, 0, 4095).astype(np.uint16)
+
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    meta.MediaStorageSOPInstanceUID = f"1.2.826.0.1.3680043.10.1.{seed}"
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.preamble = b"\0" * 128
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Modality = "OT"
+    ds.Rows, ds.Columns = pixels.shape
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 12
+    ds.HighBit = 11
+    ds.PixelRepresentation = 0
+    ds.PixelData = pixels.tobytes()
+
+    buffer = io.BytesIO()
+    dicom.dcmwrite(buffer, ds, enforce_file_format=True)
+    return buffer.getvalue()
+
+
+def build_samples(n_images=8, seed=0):
+    """
+    Construye el conjunto fijo de muestras sintéticas.
+
+    Returns:
+        list: Diccionarios {'name', 'dicom', 'array'} con el DICOM en bytes
+            y la imagen RGB cargada por ``ImageLoader``.
+    """
+    samples = []
+    for i in range(n_images):
+        content = make_synthetic_dicom(seed + i)
+        samples.append({
+            'name': f"sintetica_{seed + i}",
+            'dicom': content,
+            'array': ImageLoader(content).get_img_RGB()
+        })
+    return samples
+
+
+def heatmap_correlation(reference, candidate):
+    """
+    Correlación de Pearson entre dos heatmaps de la misma forma.
+
+    Returns:
+        float: Correlación en [-1, 1]; 1.0 si ambos son constantes e iguales.
+
+    Raises:
+        ValueError: Si las formas no coinciden.
+    """
+    reference = np.asarray(reference, dtype=np.float64).ravel()
+    candidate = np.asarray(candidate, dtype=np.float64).ravel()
+    if reference.shape != candidate.shape:
+        raise ValueError(
+            f"Los heatmaps deben tener la misma forma: {reference.shape} != {candidate.shape}"
+        )
+    if reference.std() == 0 or candidate.std() == 0:
+        return 1.0 if np.array_equal(reference, candidate) else 0.0
+    return float(np.corrcoef(reference, candidate)[0, 1])
+
+
+def compare_outputs(reference, candidate, tolerances=None):
+    """
+    Compara las salidas de un modo contra las de referencia.
+
+    Cada salida es un diccionario {'label_idx', 'confidence',
+    'probabilities', 'heatmap', 'heatmaps'}; ``probabilities`` puede ser None
+    si el modo solo reporta la confianza de la clase predicha, en cuyo caso
+    se compara esa confianza con la probabilidad de referencia de la misma
+    clase. Si el candidato trae ``heatmaps`` (índice de clase -> CAM), se
+    compara el CAM de cada clase contra el de referencia; si no, solo el
+    ``heatmap`` de la clase predicha.
+
+    Returns:
+        dict: {'max_prob_delta', 'label_agreement',
+            'min_heatmap_correlation', 'passed'}
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    if len(reference) != len(candidate):
+        raise ValueError("Las salidas deben tener la misma cantidad de muestras")
+
+    deltas, agreements, correlations = [], [], []
+    for ref, cand in zip(reference, candidate):
+        if cand['probabilities'] is not None:
+            deltas.append(float(np.max(np.abs(ref['probabilities'] - cand['probabilities']))))
+        else:
+            deltas.append(abs(float(ref['probabilities'][cand['label_idx']]) - cand['confidence']))
+        agreements.append(ref['label_idx'] == cand['label_idx'])
+        if cand.get('heatmaps') is not None:
+            correlations.extend(
+                heatmap_correlation(ref['heatmaps'][class_idx], heatmap)
+                for class_idx, heatmap in cand['heatmaps'].items()
+            )
+        else:
+            correlations.append(heatmap_correlation(ref['heatmap'], cand['heatmap']))
+
+    report = {
+        'max_prob_delta': max(deltas),
+        'label_agreement': float(np.mean(agreements)),
+        'min_heatmap_correlation': min(correlations)
+    }
+    report['passed'] = (
+        report['max_prob_delta'] <= tolerances['max_prob_delta']
+        and report['label_agreement'] >= tolerances['label_agreement']
+        and report['min_heatmap_correlation'] >= tolerances['min_heatmap_correlation']
+    )
+    return report
+
+
+def _output(predictor, label, confidence, heatmap, probabilities=None, heatmaps=None):
+    """Normaliza la salida de un modo al formato de ``compare_outputs``."""
+    label_idx = {name: idx for idx, name in predictor.label_map.items()}
+    return {
+        'label_idx': label_idx[label],
+        'confidence': confidence / 100,
+        'probabilities': None if probabilities is None else np.asarray(probabilities),
+        'heatmap': heatmap,
+        'heatmaps': None if heatmaps is None else {
+            label_idx[name]: cam for name, cam in heatmaps.items()
+        }
+    }
+
+
+def run_reference(predictor, integrator, samples, all_classes=False):
+    """
+    Ruta original: ``model.predict`` y Grad-CAM por imagen y clase.
+
+    Con ``all_classes`` calcula también, con ``generate`` clase por clase,
+    el CAM de las clases no predichas.
+    """
+    outputs = []
+    for sample in samples:
+        batch = ImagePreprocessor.preprocess(sample['array'])
+        probabilities = predictor.model.predict(batch, verbose=0)[0]
+        label_idx = int(np.argmax(probabilities))
+        classes = range(len(probabilities)) if all_classes else [label_idx]
+        heatmaps = {
+            class_idx: predictor.grad_cam.generate(
+                sample['array'], class_idx, batch, heatmap_format=HEATMAP_FORMAT
+            )
+            for class_idx in classes
+        }
+        outputs.append({
+            'label_idx': label_idx,
+            'confidence': float(probabilities[label_idx]),
+            'probabilities': probabilities,
+            'heatmap': heatmaps[label_idx],
+            'heatmaps': heatmaps
+        })
+    return outputs
+
+
+def run_predict(predictor, integrator, samples):
+    """``Predictor.predict`` (llamada directa al modelo)."""
+    outputs = []
+    for sample in samples:
+        label, confidence, heatmap = predictor.predict(
+            sample['array'], heatmap_format=HEATMAP_FORMAT
+        )
+        outputs.append(_output(predictor, label, confidence, heatmap))
+    return outputs
+
+
+def run_predict_batch(predictor, integrator, samples):
+    """``Predictor.predict_batch`` con todas las muestras en un lote."""
+    results = predictor.predict_batch(
+        [sample['array'] for sample in samples], with_heatmap=True,
+        heatmap_format=HEATMAP_FORMAT
+    )
+    return [
+        _output(predictor, label, confidence, heatmap, probabilities)
+        for label, confidence, probabilities, heatmap in results
+    ]
+
+
+def run_all_classes(predictor, integrator, samples):
+    """Grad-CAM de todas las clases con un único Jacobiano (se comparan todas)."""
+    outputs = []
+    for sample in samples:
+        label, confidence, heatmaps = predictor.predict_all_classes(
+            sample['array'], HEATMAP_FORMAT
+        )
+        outputs.append(
+            _output(predictor, label, confidence, heatmaps[label], heatmaps=heatmaps)
+        )
+    return outputs
+
+
+def run_compact_cam(predictor, integrator, samples):
+    """CAM compacto cuantizado a uint8."""
+    outputs = []
+    for sample in samples:
+        label, confidence, cam = predictor.predict(sample['array'], heatmap_format="cam")
+        outputs.append(_output(predictor, label, confidence, cam))
+    return outputs
+
+
+def run_stateless_bytes(predictor, integrator, samples):
+    """``PneumoniaIntegrator.analyze`` sobre el DICOM en memoria."""
+    outputs = []
+    for sample in samples:
+        result = integrator.analyze(sample['dicom'], heatmap_format=HEATMAP_FORMAT)
+        outputs.append(
+            _output(predictor, result['label'], result['probability'], result['heatmap'])
+        )
+    return outputs
+
+
+def run_study_stream(predictor, integrator, samples):
+    """Lectura perezosa del estudio con inferencia en lotes de 4."""
+    results = integrator.iter_study_results(
+        [sample['dicom'] for sample in samples], batch_size=4, with_heatmap=True,
+        heatmap_format=HEATMAP_FORMAT
+    )
+    return [
+        _output(predictor, result['label'], result['probability'],
+                result['heatmap'], result['probabilities'])
+        for result in results
+    ]
+
+
+MODES = {
+    "predict": run_predict,
+    "predict_batch": run_predict_batch,
+    "all_classes": run_all_classes,
+    "compact_cam": run_compact_cam,
+    "stateless_bytes": run_stateless_bytes,
+    "study_stream": run_study_stream,
+}
+
+
+def run_harness(predictor, integrator, samples, modes=None, tolerances=None):
+    """
+    Ejecuta la referencia y cada modo, y compara los resultados.
+
+    Args:
+        predictor (Predictor): Predictor cargado.
+        integrator (PneumoniaIntegrator): Integrador que comparte el predictor.
+        samples (list): Muestras de ``build_samples``.
+        modes (list): Nombres de ``MODES`` a evaluar; por defecto todos.
+        tolerances (dict): Tolerancias que reemplazan a ``DEFAULT_TOLERANCES``.
+
+    Returns:
+        dict: Nombre del modo -> reporte de ``compare_outputs``.
+    """
+    modes = modes or list(MODES)
+    reference = run_reference(
+        predictor, integrator, samples, all_classes="all_classes" in modes
+    )
+    reports = {}
+    for name in modes:
+        candidate = MODES[name](predictor, integrator, samples)
+        reports[name] = compare_outputs(reference, candidate, tolerances)
+    return reports
+
+
+def main():
+    """Ejecuta el arnés e imprime el reporte; sale con código 1 si algo falla."""
+    parser = argparse.ArgumentParser(description="Regresión contra salidas de referencia")
+    parser.add_argument("--images", type=int, default=8, help="Cantidad de DICOM sintéticos")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del conjunto sintético")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), help="Modos a evaluar")
+    args = parser.parse_args()
+
+    from predictor import Predictor
+    from integrator import PneumoniaIntegrator
+
+    predictor = Predictor()
+    integrator = PneumoniaIntegrator(profile=False, predictor=predictor)
+    samples = build_samples(args.images, args.seed)
+
+    reports = run_harness(predictor, integrator, samples, args.modes)
+
+    print(f"{'modo':<16} {'Δprob máx':>10} {'etiquetas':>10} {'corr. mín':>10}  estado")
+    for name, report in reports.items():
+        status = "OK" if report['passed'] else "FALLA"
+        print(
+            f"{name:<16} {report['max_prob_delta']:>10.2e} "
+            f"{report['label_agreement']:>10.2%} "
+            f"{report['min_heatmap_correlation']:>10.4f}  {status}"
+        )
+
+    sys.exit(0 if all(report['passed'] for report in reports.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Configuración central de hilos de CPU para TensorFlow y OpenCV.
+"""
+
+import os
+
+import cv2
+
+
+INTRA_OP_ENV_VAR = "NEUMONIA_INTRA_OP_THREADS"
+INTER_OP_ENV_VAR = "NEUMONIA_INTER_OP_THREADS"
+OPENCV_THREADS_ENV_VAR = "NEUMONIA_OPENCV_THREADS"
+CPU_AFFINITY_ENV_VAR = "NEUMONIA_CPU_AFFINITY"
+
+
+class RuntimeConfig:
+    """
+    Topología de hilos de un proceso worker.
+
+    Por defecto TensorFlow (pools intra/inter-op) y OpenCV (``cv2.resize``,
+    CLAHE) usan todos los núcleos; con varios workers por nodo eso
+    sobresuscribe la CPU. Esta clase fija los tamaños de los pools y,
+    opcionalmente, ancla el proceso a un conjunto de núcleos. Debe
+    aplicarse antes de cargar el modelo, porque TensorFlow no permite
+    cambiar sus pools una vez inicializado.
+
+    Attributes:
+        intra_op_threads (int | None): Hilos por operación de TensorFlow.
+        inter_op_threads (int | None): Operaciones de TensorFlow en paralelo.
+        opencv_threads (int | None): Hilos del pool de OpenCV.
+        cpu_affinity (list | None): Núcleos a los que se ancla el proceso.
+
+    Un valor None deja el valor por defecto de la librería.
+    """
+
+    def __init__(self, intra_op_threads=None, inter_op_threads=None,
+                 opencv_threads=None, cpu_affinity=None):
+        """
+        Inicializa la configuración.
+
+        Raises:
+            ValueError: Si algún número de hilos es negativo.
+        """
+        for name, value in (("intra_op_threads", intra_op_threads),
+                            ("inter_op_threads", inter_op_threads),
+                            ("opencv_threads", opencv_threads)):
+            if value is not None and value < 0:
+                raise ValueError(f"{name} no puede ser negativo: {value}")
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.opencv_threads = opencv_threads
+        self.cpu_affinity = list(cpu_affinity) if cpu_affinity else None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Crea la configuración desde variables de entorno.
+
+        ``NEUMONIA_INTRA_OP_THREADS``, ``NEUMONIA_INTER_OP_THREADS``,
+        ``NEUMONIA_OPENCV_THREADS`` y ``NEUMONIA_CPU_AFFINITY`` (lista de
+        núcleos como ``"0-3,6"``). Las variables ausentes se ignoran.
+        """
+        def read_int(name):
+            value = os.environ.get(name, "").strip()
+            return int(value) if value else None
+
+        affinity = os.environ.get(CPU_AFFINITY_ENV_VAR, "").strip()
+        return cls(
+            intra_op_threads=read_int(INTRA_OP_ENV_VAR),
+            inter_op_threads=read_int(INTER_OP_ENV_VAR),
+            opencv_threads=read_int(OPENCV_THREADS_ENV_VAR),
+            cpu_affinity=cls.parse_cpu_list(affinity) if affinity else None,
+        )
+
+    @staticmethod
+    def parse_cpu_list(text):
+        """
+        Convierte una lista de núcleos (``"0-3,6"``) en una lista de enteros.
+
+        Raises:
+            ValueError: Si el formato no es válido.
+        """
+        cpus = set()
+        for part in text.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                start, end = part.split("-", 1)
+                cpus.update(range(int(start), int(end) + 1))
+            else:
+                cpus.add(int(part))
+        return sorted(cpus)
+
+    def to_env(self):
+        """
+        Retorna las variables de entorno equivalentes a esta configuración.
+
+        Útil para lanzar workers en subprocesos con la misma topología.
+        """
+        env = {}
+        if self.intra_op_threads is not None:
+            env[INTRA_OP_ENV_VAR] = str(self.intra_op_threads)
+        if self.inter_op_threads is not None:
+            env[INTER_OP_ENV_VAR] = str(self.inter_op_threads)
+        if self.opencv_threads is not None:
+            env[OPENCV_THREADS_ENV_VAR] = str(self.opencv_threads)
+        if self.cpu_affinity:
+            env[CPU_AFFINITY_ENV_VAR] = ",".join(str(cpu) for cpu in self.cpu_affinity)
+        return env
+
+    def apply(self):
+        """
+        Aplica la configuración al proceso actual.
+
+        Raises:
+            ValueError: Si TensorFlow ya inicializó sus pools de hilos.
+        """
+        if self.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.cpu_affinity)
+
+        if self.opencv_threads is not None:
+            cv2.setNumThreads(self.opencv_threads)
+
+        if self.intra_op_threads is None and self.inter_op_threads is None:
+            return
+
+        # Import diferido: el proceso que solo orquesta workers no necesita TF
+        import tensorflow as tf
+
+        threading = tf.config.threading
+        if (threading.get_intra_op_parallelism_threads() == (self.intra_op_threads or 0)
+                and threading.get_inter_op_parallelism_threads() == (self.inter_op_threads or 0)):
+            return
+        try:
+            if self.intra_op_threads is not None:
+                threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+            if self.inter_op_threads is not None:
+                threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        except RuntimeError as e:
+            raise ValueError(
+                f"No se pudo configurar los hilos de TensorFlow; debe hacerse "
+                f"antes de cargar el modelo: {str(e)}"
+            )
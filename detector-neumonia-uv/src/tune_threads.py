@@ -0,0 +1,196 @@
+"""
+Auto-ajuste de la topología de hilos midiendo estudios por segundo.
+
+Uso (desde detector-neumonia-uv/):
+
+    uv run python src/tune_threads.py --images imagenes/ --workers 4
+
+Cada combinación de hilos se mide en subprocesos nuevos, porque TensorFlow
+no permite cambiar sus pools una vez inicializado. Con ``--workers N`` se
+lanzan N workers a la vez para reproducir la carga real de un nodo: todos
+cargan el modelo y se calientan, y solo entonces reciben juntos la señal de
+inicio, así las mediciones se solapan de verdad.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+from read_study import StudyLoader
+from runtime_config import RuntimeConfig
+
+
+# Línea que imprime cada worker al terminar el calentamiento
+READY_SIGNAL = "listo"
+
+
+def _parse_int_list(text):
+    """Convierte ``"1,2,4"`` en ``[1, 2, 4]``."""
+    return [int(value) for value in text.split(",") if value.strip()]
+
+
+def _default_intra_op(cpu_count):
+    """Potencias de dos hasta el número de núcleos disponibles."""
+    values = []
+    n = 1
+    while n <= cpu_count:
+        values.append(n)
+        n *= 2
+    return ",".join(str(value) for value in values)
+
+
+def _list_images(directory):
+    """Lista ordenada de las imágenes DICOM del directorio de benchmark."""
+    return StudyLoader(directory).files
+
+
+def _wait_ready(process):
+    """
+    Espera a que un worker termine su calentamiento.
+
+    Raises:
+        RuntimeError: Si el worker terminó sin avisar que está listo.
+    """
+    for line in process.stdout:
+        if line.strip() == READY_SIGNAL:
+            return
+    process.wait()
+    raise RuntimeError(f"El worker falló con código {process.returncode}")
+
+
+def run_worker(images, repeat):
+    """
+    Mide estudios por segundo en el proceso actual.
+
+    La topología de hilos llega por variables de entorno y la aplica
+    ``ModelLoader`` al crear el integrador. Tras el calentamiento imprime
+    ``READY_SIGNAL`` y espera una línea en stdin antes de medir. Imprime una
+    línea JSON con el resultado.
+    """
+    from integrator import PneumoniaIntegrator
+
+    integrator = PneumoniaIntegrator(profile=False)
+
+    # Calentamiento: construcción del grafo y modelo de gradientes
+    integrator.analyze(images[0])
+
+    # Señal de inicio común a todos los workers
+    print(READY_SIGNAL, flush=True)
+    sys.stdin.readline()
+
+    start = time.perf_counter()
+    studies = 0
+    for _ in range(repeat):
+        for path in images:
+            integrator.analyze(path)
+            studies += 1
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({"studies": studies, "seconds": elapsed}))
+
+
+def measure(config, args, cpus):
+    """
+    Lanza ``args.workers`` workers con la configuración dada.
+
+    Los workers arrancan a medir a la vez. El resultado divide el total de
+    estudios por el tiempo del worker más lento, así no se sobreestima el
+    rendimiento del nodo si los workers no se solapan del todo. Si un
+    worker falla, los demás se terminan.
+
+    Returns:
+        float: Estudios por segundo del conjunto de workers.
+    """
+    processes = []
+    try:
+        for worker_index in range(args.workers):
+            worker_config = RuntimeConfig(
+                config.intra_op_threads,
+                config.inter_op_threads,
+                config.opencv_threads,
+                cpus[worker_index::args.workers] if args.pin else None,
+            )
+            env = dict(os.environ, **worker_config.to_env())
+            command = [
+                sys.executable, os.path.abspath(__file__), "--worker",
+                "--images", args.images, "--repeat", str(args.repeat),
+            ]
+            processes.append(subprocess.Popen(
+                command, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+            ))
+
+        for process in processes:
+            _wait_ready(process)
+        for process in processes:
+            process.stdin.write("\n")
+            process.stdin.close()
+
+        studies = 0
+        seconds = 0.0
+        for process in processes:
+            output = process.stdout.read()
+            if process.wait() != 0:
+                raise RuntimeError(f"El worker falló con código {process.returncode}")
+            result = json.loads(output.strip().splitlines()[-1])
+            studies += result["studies"]
+            seconds = max(seconds, result["seconds"])
+        return studies / seconds
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+
+def main():
+    """Recorre las combinaciones de hilos e informa la más rápida."""
+    cpu_count = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(description="Ajuste de hilos de TensorFlow/OpenCV")
+    parser.add_argument("--images", required=True, help="Directorio con DICOM de benchmark")
+    parser.add_argument("--workers", type=int, default=1, help="Workers simultáneos por nodo")
+    parser.add_argument("--intra", default=_default_intra_op(cpu_count), help="Valores intra-op, p. ej. 1,2,4")
+    parser.add_argument("--inter", default="1,2", help="Valores inter-op")
+    parser.add_argument("--opencv", default="1", help="Valores de hilos de OpenCV")
+    parser.add_argument("--repeat", type=int, default=3, help="Pasadas sobre las imágenes por medición")
+    parser.add_argument("--pin", action="store_true", help="Reparte y ancla los núcleos entre workers")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    try:
+        images = _list_images(args.images)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.worker:
+        run_worker(images, args.repeat)
+        return
+
+    cpus = (
+        sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity")
+        else list(range(cpu_count))
+    )
+
+    results = []
+    for intra, inter, opencv in itertools.product(
+        _parse_int_list(args.intra), _parse_int_list(args.inter), _parse_int_list(args.opencv)
+    ):
+        config = RuntimeConfig(intra, inter, opencv)
+        throughput = measure(config, args, cpus)
+        results.append((throughput, config))
+        print(f"intra={intra:<3} inter={inter:<3} opencv={opencv:<3} -> {throughput:.2f} estudios/s")
+
+    throughput, best = max(results, key=lambda item: item[0])
+    print(f"\nMejor configuración ({throughput:.2f} estudios/s con {args.workers} worker(s)):")
+    for name, value in best.to_env().items():
+        print(f"{name}={value}")
+    if args.pin:
+        print("Anclar cada worker a su propio subconjunto de núcleos (NEUMONIA_CPU_AFFINITY).")
+
+
+if __name__ == "__main__":
+    main()
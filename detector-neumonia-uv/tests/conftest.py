@@ -3,3 +3,6 @@ from pathlib import Path
 
 # Add the parent directory to the Python path so imports work correctly
 sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Los módulos de src se importan entre sí de forma plana (p. ej. `from read_img import ...`)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
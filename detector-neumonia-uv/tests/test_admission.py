@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+from src.admission import (
+    AdmissionController,
+    MemoryBudgetError,
+    MEMORY_BUDGET_ENV_VAR,
+    RETAINED_BYTES_PER_PIXEL,
+    WORKING_BYTES_PER_PIXEL,
+    estimate_decode_footprint,
+    estimate_frame_footprint,
+)
+
+
+def _mock_header(rows, cols, bits, frames=None):
+    header = MagicMock(spec=["Rows", "Columns", "BitsAllocated", "SamplesPerPixel", "NumberOfFrames"])
+    header.Rows = rows
+    header.Columns = cols
+    header.BitsAllocated = bits
+    header.SamplesPerPixel = 1
+    header.NumberOfFrames = frames
+    return header
+
+
+def test_estimate_decode_footprint():
+    """
+    Prueba que la huella se calcula como rows × cols × frames × bytes por píxel.
+    Verifica que:
+        - Un DICOM de 16 bits usa 2 bytes crudos más los arrays de trabajo.
+        - Un multi-frame multiplica por el número de frames.
+    """
+    per_pixel = 2 + WORKING_BYTES_PER_PIXEL
+
+    with patch("pydicom.dcmread", return_value=_mock_header(100, 50, 16)):
+        assert estimate_decode_footprint("a.dcm") == 100 * 50 * per_pixel
+
+    with patch("pydicom.dcmread", return_value=_mock_header(100, 50, 16, frames=3)):
+        assert estimate_decode_footprint("a.dcm") == 3 * 100 * 50 * per_pixel
+
+
+def test_estimate_frame_footprint():
+    """
+    Prueba la huella de un frame dentro de un lote perezoso.
+    Verifica que:
+        - La decodificación cuenta los bytes crudos y los arrays de trabajo.
+        - Lo retenido mientras espera el lote es solo la copia RGB.
+        - Los frames del archivo no multiplican la estimación y se
+          reportan aparte.
+    """
+    with patch("pydicom.dcmread", return_value=_mock_header(100, 50, 16, frames=3)):
+        decode_bytes, retained_bytes, frames = estimate_frame_footprint("a.dcm")
+
+    assert decode_bytes == 100 * 50 * (2 + WORKING_BYTES_PER_PIXEL)
+    assert retained_bytes == 100 * 50 * RETAINED_BYTES_PER_PIXEL
+    assert frames == 3
+
+
+def test_rejects_oversized_request():
+    """Prueba que una solicitud mayor que el presupuesto total se rechaza."""
+    controller = AdmissionController(1000)
+    with pytest.raises(MemoryBudgetError):
+        controller.acquire(1001)
+    assert controller.in_use == 0
+
+
+def test_rejects_when_queue_times_out():
+    """
+    Prueba que, sin espacio libre, la solicitud se rechaza al agotar la espera.
+    """
+    controller = AdmissionController(1000, timeout=0)
+    with controller.admit(800):
+        with pytest.raises(MemoryBudgetError):
+            controller.acquire(300)
+    assert controller.in_use == 0
+
+
+def test_queued_request_is_admitted_after_release():
+    """
+    Prueba que una solicitud en cola se admite cuando otra libera memoria.
+    """
+    controller = AdmissionController(1000)
+    controller.acquire(800)
+    admitted = threading.Event()
+
+    def worker():
+        with controller.admit(300):
+            admitted.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not admitted.wait(0.05)
+
+    controller.release(800)
+    thread.join(timeout=1)
+    assert admitted.is_set()
+    assert controller.in_use == 0
+
+
+def test_from_env(monkeypatch):
+    """Prueba que el presupuesto se toma de NEUMONIA_MEMORY_BUDGET_MB."""
+    monkeypatch.delenv(MEMORY_BUDGET_ENV_VAR, raising=False)
+    assert AdmissionController.from_env() is None
+
+    monkeypatch.setenv(MEMORY_BUDGET_ENV_VAR, "2")
+    assert AdmissionController.from_env().budget_bytes == 2 * 1024 * 1024
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from src.export import ColumnarResultWriter, load_results, result_dtype
+
+
+def _result(i):
+    return {
+        'source': f"/estudios/paciente_{i}.dcm",
+        'frame': i % 3,
+        'label_idx': i % 3,
+        'probabilities': np.array([0.5, 0.3, 0.2], dtype=np.float32),
+        'image_hash': f"{i:032x}",
+        'timings': {'load_ms': 1.5, 'inference_ms': 12.25}
+    }
+
+
+def test_result_dtype_columns():
+    """Prueba que hay una columna de probabilidad por etiqueta."""
+    names = result_dtype(("a", "b")).names
+    assert names == (
+        "source", "frame", "label_idx", "prob_a", "prob_b",
+        "load_ms", "inference_ms", "image_hash"
+    )
+
+
+def test_writer_appends_in_chunks(tmp_path):
+    """
+    Prueba que las filas se escriben por bloques y el archivo es un .npy válido.
+    Verifica que:
+        - Tras cada bloque completo, np.load ve las filas ya escritas.
+        - Al cerrar se escriben las filas pendientes.
+        - Los valores tipados se conservan.
+    """
+    path = str(tmp_path / "resultados.npy")
+
+    with ColumnarResultWriter(path, chunk_size=4) as writer:
+        writer.extend(_result(i) for i in range(5))
+        assert writer.count == 4
+        assert len(np.load(path)) == 4
+
+    data = load_results(path)
+    assert len(data) == 5
+    assert data["label_idx"].tolist() == [0, 1, 2, 0, 1]
+    assert data["prob_bacteriana"][0] == pytest.approx(0.5)
+    assert data["inference_ms"][4] == pytest.approx(12.25)
+    assert data["image_hash"][3] == b"%032x" % 3
+    assert data["source"][2] == b"/estudios/paciente_2.dcm"
+
+
+def test_header_size_is_stable(tmp_path):
+    """
+    Prueba que el header no cambia de tamaño al crecer el contador de filas,
+    de modo que se puede reescribir sin mover los datos.
+    """
+    path = str(tmp_path / "resultados.npy")
+    writer = ColumnarResultWriter(path)
+    empty_header = writer._header()
+    writer.count = 10**12
+    assert len(writer._header()) == len(empty_header)
+    assert len(empty_header) % 64 == 0
+    writer.count = 0
+    writer.close()
+
+    assert len(np.load(path)) == 0
+
+
+def test_source_is_truncated_to_column_width(tmp_path):
+    """Prueba que rutas largas conservan su final dentro de 128 bytes."""
+    path = str(tmp_path / "resultados.npy")
+    result = _result(0)
+    result['source'] = "/ñ" * 100 + "/placa.dcm"
+
+    with ColumnarResultWriter(path) as writer:
+        writer.append(result)
+
+    source = load_results(path)["source"][0]
+    assert len(source) <= 128
+    assert source.decode("utf-8").endswith("/placa.dcm")
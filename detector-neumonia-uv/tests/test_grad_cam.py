@@ -0,0 +1,92 @@
+import pytest
+import numpy as np
+import tensorflow as tf
+from src.grad_cam import GradCAMGenerator
+from src.preprocess_img import ImagePreprocessor
+
+
+N_CLASSES = 3
+
+
+@pytest.fixture(scope="module")
+def generator():
+    """GradCAMGenerator sobre un modelo mínimo con la capa conv10_thisone."""
+    tf.keras.utils.set_random_seed(1)
+    inputs = tf.keras.Input(shape=(512, 512, 1), name="input_1")
+    x = tf.keras.layers.Conv2D(32, 3, strides=32, padding="same", activation="relu",
+                               name="conv10_thisone")(inputs)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(N_CLASSES, activation="softmax")(x)
+    return GradCAMGenerator(tf.keras.Model(inputs, outputs))
+
+
+@pytest.fixture(scope="module")
+def sample():
+    """Imagen RGB de prueba y su versión preprocesada."""
+    rng = np.random.default_rng(0)
+    array = rng.integers(0, 256, (300, 260, 3), dtype=np.uint8)
+    return array, ImagePreprocessor.preprocess(array)
+
+
+@pytest.mark.parametrize("heatmap_format", ["overlay", "cam_float16"])
+def test_generate_all_matches_generate(generator, sample, heatmap_format):
+    """
+    Prueba que generate_all reproduce generate para cada clase.
+    Verifica que:
+        - Se genera un heatmap por clase del modelo, no trivial y distinto
+          entre clases.
+        - El heatmap de cada clase coincide con generate(array, clase, batch).
+        - Las probabilidades son las del modelo.
+    """
+    array, batch = sample
+
+    predictions, heatmaps = generator.generate_all(array, batch, heatmap_format)
+
+    assert sorted(heatmaps) == list(range(N_CLASSES))
+    assert np.allclose(predictions, generator.model(batch).numpy()[0], atol=1e-6)
+    for class_idx in range(N_CLASSES):
+        expected = generator.generate(array, class_idx, batch, heatmap_format)
+        assert heatmaps[class_idx].shape == expected.shape
+        assert np.allclose(
+            heatmaps[class_idx].astype(np.float32), expected.astype(np.float32), atol=1e-3
+        )
+
+    if heatmap_format == "cam_float16":
+        assert all(heatmaps[class_idx].std() > 0 for class_idx in range(N_CLASSES))
+        assert not np.array_equal(heatmaps[0], heatmaps[1])
+        assert not np.array_equal(heatmaps[1], heatmaps[2])
+
+
+def test_compact_cam_format(generator, sample):
+    """
+    Prueba que el formato "cam" retorna la grilla de conv10_thisone en uint8.
+    """
+    array, batch = sample
+
+    cam = generator.generate(array, 0, batch, heatmap_format="cam")
+
+    conv_grid = generator.model.get_layer("conv10_thisone").output.shape[1:3]
+    assert cam.dtype == np.uint8
+    assert cam.shape == tuple(conv_grid)
+
+
+def test_compose_overlay_matches_overlay(generator, sample):
+    """
+    Prueba que componer un CAM compacto a 512x512 reproduce el formato "overlay".
+    Verifica que:
+        - La forma y el tipo coinciden con la salida "overlay".
+        - Los píxeles difieren como mucho por el redondeo de float16.
+    """
+    array, batch = sample
+
+    for class_idx in range(N_CLASSES):
+        overlay = generator.generate(array, class_idx, batch)
+        cam = generator.generate(array, class_idx, batch, heatmap_format="cam_float16")
+
+        composed = GradCAMGenerator.compose_overlay(cam, array)
+
+        assert composed.shape == overlay.shape == (512, 512, 3)
+        assert composed.dtype == overlay.dtype
+        diff = np.abs(composed.astype(np.int16) - overlay.astype(np.int16))
+        assert diff.max() <= 4
+        assert np.mean(diff > 0) < 0.01
@@ -0,0 +1,205 @@
+import hashlib
+import threading
+
+import pytest
+import numpy as np
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage, generate_uid
+from src.admission import (
+    AdmissionController,
+    MemoryBudgetError,
+    RETAINED_BYTES_PER_PIXEL,
+    WORKING_BYTES_PER_PIXEL,
+)
+from src.export import load_results
+from src.integrator import PneumoniaIntegrator
+from src.read_img import ImageLoader
+from src.read_study import StudyLoader
+
+
+ROWS, COLS = 100, 80
+DECODE_BYTES = ROWS * COLS * (2 + WORKING_BYTES_PER_PIXEL)
+RETAINED_BYTES = ROWS * COLS * RETAINED_BYTES_PER_PIXEL
+
+
+def _write_dicom(path, n_frames=1, rows=ROWS):
+    """Escribe un DICOM de 16 bits de rows x COLS con n_frames frames."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Rows, ds.Columns = rows, COLS
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 0
+    if n_frames > 1:
+        ds.NumberOfFrames = n_frames
+    frames = np.arange(1, n_frames * rows * COLS + 1, dtype=np.uint16)
+    ds.PixelData = frames.tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+class _StubPredictor:
+    """Predictor sin modelo que registra los lotes recibidos."""
+
+    label_map = {0: "bacteriana", 1: "normal", 2: "viral"}
+
+    def __init__(self, admission=None):
+        self.admission = admission
+        self.batches = []
+        self.reserved = []
+
+    def predict_batch(self, image_arrays, with_heatmap=False, heatmap_format="overlay"):
+        self.batches.append(len(image_arrays))
+        if self.admission is not None:
+            self.reserved.append(self.admission.in_use)
+        probabilities = np.array([0.1, 0.8, 0.1])
+        return [("normal", 80.0, probabilities, None) for _ in image_arrays]
+
+
+def _integrator(budget):
+    admission = AdmissionController(budget, timeout=0)
+    predictor = _StubPredictor(admission)
+    return PneumoniaIntegrator(profile=False, admission=admission, predictor=predictor)
+
+
+def test_study_batch_shrinks_to_fit_budget(tmp_path):
+    """
+    Prueba que el lote se reduce para caber en el presupuesto.
+    Verifica que:
+        - Se reserva un frame decodificado más la copia RGB del resto del lote.
+        - Los frames se procesan en lotes del tamaño reducido.
+        - La reserva se libera al terminar.
+    """
+    path = tmp_path / "multi.dcm"
+    _write_dicom(path, n_frames=3)
+    integrator = _integrator(DECODE_BYTES + RETAINED_BYTES)
+
+    results = list(integrator.iter_study_results(str(path), batch_size=8))
+
+    assert len(results) == 3
+    assert integrator.predictor.batches == [2, 1]
+    assert integrator.predictor.reserved == [DECODE_BYTES + RETAINED_BYTES] * 2
+    assert integrator.admission.in_use == 0
+
+
+def test_study_batch_capped_at_frame_count(tmp_path):
+    """
+    Prueba que un estudio de un frame no reserva lugar para frames inexistentes.
+    """
+    path = tmp_path / "single.dcm"
+    _write_dicom(path)
+    integrator = _integrator(10 * DECODE_BYTES)
+
+    list(integrator.iter_study_results(str(path), batch_size=8))
+
+    assert integrator.predictor.batches == [1]
+    assert integrator.predictor.reserved == [DECODE_BYTES]
+
+
+def test_study_rejected_when_one_frame_does_not_fit(tmp_path):
+    """
+    Prueba que un estudio se rechaza solo si ni un frame cabe en el presupuesto.
+    Verifica que:
+        - Se lanza MemoryBudgetError antes de decodificar.
+        - El error informa la huella de un frame, no la del lote pedido.
+    """
+    path = tmp_path / "multi.dcm"
+    _write_dicom(path, n_frames=2)
+    integrator = _integrator(DECODE_BYTES - 1)
+
+    with pytest.raises(MemoryBudgetError, match=f"~{DECODE_BYTES / 2**20:.1f} MB"):
+        list(integrator.iter_study_results(str(path), batch_size=8))
+
+    assert integrator.predictor.batches == []
+    assert integrator.admission.in_use == 0
+
+
+class _ConcurrentPredictor:
+    """Predictor sin modelo que obliga a que todas las llamadas se solapen."""
+
+    label_map = {0: "bacteriana", 1: "normal", 2: "viral"}
+
+    def __init__(self, n_threads):
+        self.barrier = threading.Barrier(n_threads, timeout=10)
+
+    def predict(self, image_array, heatmap_format="overlay"):
+        # Ninguna llamada continúa hasta que todas estén dentro de predict
+        self.barrier.wait()
+        return "normal", float(image_array.shape[0]), image_array
+
+
+def test_analyze_is_safe_across_threads(tmp_path):
+    """
+    Prueba que analyze puede llamarse a la vez desde varios hilos.
+    Verifica que:
+        - Todas las llamadas se ejecutan en paralelo sobre la misma instancia.
+        - Cada hilo recibe el resultado de su propia imagen.
+    """
+    n_threads = 6
+    paths = []
+    for i in range(n_threads):
+        path = tmp_path / f"img_{i}.dcm"
+        _write_dicom(path, rows=20 + i)
+        paths.append(str(path))
+
+    integrator = PneumoniaIntegrator(
+        profile=False,
+        admission=AdmissionController(2**30),
+        predictor=_ConcurrentPredictor(n_threads)
+    )
+    results = [None] * n_threads
+
+    def worker(i):
+        results[i] = integrator.analyze(paths[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    for i, result in enumerate(results):
+        assert result['probability'] == 20 + i
+        assert np.array_equal(
+            result['heatmap'], ImageLoader(paths[i], preview=False).get_img_RGB()
+        )
+    assert integrator.current_array is None
+    assert integrator.admission.in_use == 0
+
+
+def test_image_hash_only_computed_for_export(tmp_path):
+    """
+    Prueba que el hash por frame solo se calcula cuando se pide.
+    Verifica que:
+        - Sin with_hash los resultados no traen image_hash.
+        - Con with_hash el hash es el BLAKE2b del frame DICOM original.
+        - export_results escribe los hashes en el archivo columnar.
+    """
+    path = tmp_path / "multi.dcm"
+    _write_dicom(path, n_frames=2)
+    integrator = _integrator(2**30)
+
+    assert all(
+        result['image_hash'] is None
+        for result in integrator.iter_study_results(str(path))
+    )
+
+    expected = [
+        hashlib.blake2b(pixels.tobytes(), digest_size=16).hexdigest()
+        for _, _, pixels in StudyLoader(str(path)).iter_pixel_frames()
+    ]
+    hashed = integrator.iter_study_results(str(path), with_hash=True)
+    assert [result['image_hash'] for result in hashed] == expected
+
+    output = tmp_path / "resultados.npy"
+    assert integrator.export_results(str(path), str(output)) == 2
+    assert [value.decode() for value in load_results(output)["image_hash"]] == expected
@@ -0,0 +1,82 @@
+import os
+import pstats
+
+import pytest
+from src.profiling import RequestProfiler, PROFILE_ENV_VAR
+
+
+def test_resolve_mode():
+    """
+    Prueba la normalización de las opciones de perfilado.
+    Verifica que:
+        - None, False y "0" desactivan el perfilado.
+        - True, "1" y "cprofile" activan cProfile.
+        - "tf" activa además la traza de TensorFlow.
+        - Un valor desconocido produce ValueError.
+    """
+    for value in (None, False, "0", ""):
+        assert RequestProfiler.resolve_mode(value) is None
+    for value in (True, "1", "cprofile", "CProfile"):
+        assert RequestProfiler.resolve_mode(value) == "cprofile"
+    assert RequestProfiler.resolve_mode("tf") == "tf"
+    with pytest.raises(ValueError):
+        RequestProfiler.resolve_mode("perf")
+
+
+def test_from_env(monkeypatch):
+    """Prueba que el modo por defecto se toma de NEUMONIA_PROFILE."""
+    monkeypatch.setenv(PROFILE_ENV_VAR, "1")
+    assert RequestProfiler.from_env().mode == "cprofile"
+
+    monkeypatch.delenv(PROFILE_ENV_VAR)
+    assert RequestProfiler.from_env().mode is None
+
+
+def test_profile_writes_file(tmp_path):
+    """
+    Prueba que una etapa perfilada genera un archivo .prof legible por pstats.
+    """
+    profiler = RequestProfiler("cprofile", output_dir=str(tmp_path))
+
+    with profiler.profile("req1", "load") as profile_path:
+        sum(range(1000))
+
+    assert profile_path == os.path.join(str(tmp_path), "req1_load.prof")
+    assert pstats.Stats(profile_path).total_calls > 0
+
+
+def test_profile_per_call_override(tmp_path):
+    """
+    Prueba que la opción por llamada tiene prioridad sobre el modo por defecto.
+    """
+    profiler = RequestProfiler(None, output_dir=str(tmp_path))
+
+    with profiler.profile("req1", "load") as profile_path:
+        pass
+    assert profile_path is None
+
+    with profiler.profile("req1", "analyze", mode=True) as profile_path:
+        pass
+    assert os.path.isfile(profile_path)
+    assert os.listdir(tmp_path) == ["req1_analyze.prof"]
+
+
+def test_new_request_id_uses_file_name():
+    """Prueba que el identificador incluye el nombre del archivo sin extensión."""
+    request_id = RequestProfiler.new_request_id("/datos/paciente 01.dcm")
+    assert request_id.endswith("_paciente_01")
+
+
+def test_concurrent_profile_is_skipped(tmp_path):
+    """
+    Prueba que una segunda captura simultánea se omite en lugar de fallar,
+    ya que solo puede haber un cProfile activo por proceso.
+    """
+    profiler = RequestProfiler("cprofile", output_dir=str(tmp_path))
+
+    with profiler.profile("req1", "analyze") as outer_path:
+        with profiler.profile("req2", "analyze") as inner_path:
+            pass
+
+    assert os.path.isfile(outer_path)
+    assert inner_path is None
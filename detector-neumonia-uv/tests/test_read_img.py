@@ -1,7 +1,7 @@
 import pytest
 import numpy as np
 from unittest.mock import MagicMock, patch
-from src.read_img import ImageLoader
+from src.read_img import ImageLoader, as_dicom_source
 
 def test_init_with_dicom():
     """
@@ -49,3 +49,129 @@ def test_get_img_RGB():
         assert img_rgb.dtype == np.uint8
 
 
+def test_init_with_bytes():
+    """
+    Prueba que ImageLoader acepta el contenido DICOM en memoria.
+    Verifica que:
+        - bytes, bytearray y memoryview se entregan a dcmread como un
+          objeto tipo archivo (sin escribir a disco).
+        - El contenido leído coincide con el buffer original.
+    """
+    payload = b"DICM" * 8
+    mock_img = MagicMock()
+    mock_img.pixel_array = np.full((10, 10), 100, dtype=np.uint8)
+
+    for buffer in (payload, bytearray(payload), memoryview(payload)):
+        with patch("pydicom.dcmread", return_value=mock_img) as mock_read:
+            loader = ImageLoader(buffer)
+            fp = mock_read.call_args.args[0]
+            assert fp.read() == payload
+            assert loader.img_RGB.shape == (10, 10, 3)
+
+
+def test_as_dicom_source_buffer_reader():
+    """
+    Prueba que el lector sobre memoryview soporta read, seek y tell
+    como espera pydicom, sin copiar el buffer completo.
+    """
+    fp = as_dicom_source(memoryview(b"0123456789"))
+
+    assert fp.read(4) == b"0123"
+    assert fp.tell() == 4
+    fp.seek(-2, 2)
+    assert fp.read() == b"89"
+    fp.seek(0)
+    assert fp.read(100) == b"0123456789"
+
+    fp.seek(6)
+    target = bytearray(8)
+    assert fp.readinto(target) == 4
+    assert bytes(target[:4]) == b"6789"
+    assert fp.readinto(target) == 0
+
+
+def test_as_dicom_source_rejects_unknown_type():
+    """Prueba que un tipo de entrada no soportado produce TypeError."""
+    with pytest.raises(TypeError):
+        as_dicom_source(12345)
+
+
+def test_preview_pyramid():
+    """
+    Prueba que la pirámide de vista previa se genera al cargar.
+    Verifica que:
+        - Los niveles van del más grueso al tamaño final de la GUI (250x250).
+        - Todos los niveles son imágenes 8-bit en escala de grises.
+    """
+    mock_img = MagicMock()
+    mock_img.pixel_array = np.random.randint(0, 4096, (1200, 1000), dtype=np.uint16)
+
+    with patch("pydicom.dcmread", return_value=mock_img):
+        pyramid = ImageLoader("dummy.dcm").get_preview_pyramid()
+
+    assert [level.size for level in pyramid] == [(63, 63), (125, 125), (250, 250)]
+    assert all(level.mode == "L" for level in pyramid)
+
+
+def test_preview_uses_dicom_window():
+    """
+    Prueba que la vista previa aplica WindowCenter/WindowWidth y
+    RescaleSlope/RescaleIntercept, e invierte las imágenes MONOCHROME1.
+    """
+    mock_img = MagicMock()
+    pixels = np.zeros((500, 500), dtype=np.uint16)
+    pixels[:, 250:] = 2000
+    mock_img.pixel_array = pixels
+    mock_img.RescaleSlope = 1
+    mock_img.RescaleIntercept = -1000
+    mock_img.WindowCenter = [0, 40]
+    mock_img.WindowWidth = [400, 80]
+    mock_img.PhotometricInterpretation = "MONOCHROME2"
+
+    with patch("pydicom.dcmread", return_value=mock_img):
+        preview = np.array(ImageLoader("dummy.dcm").get_preview_pyramid()[-1])
+        # -1000 HU queda bajo la ventana y 1000 HU por encima
+        assert preview[125, 50] == 0
+        assert preview[125, 200] == 255
+
+        mock_img.PhotometricInterpretation = "MONOCHROME1"
+        preview = np.array(ImageLoader("dummy.dcm").get_preview_pyramid()[-1])
+        assert preview[125, 50] == 255
+        assert preview[125, 200] == 0
+
+
+def test_preview_can_be_disabled():
+    """Prueba que preview=False omite la pirámide (ruta de servidor)."""
+    mock_img = MagicMock()
+    mock_img.pixel_array = np.full((10, 10), 100, dtype=np.uint8)
+
+    with patch("pydicom.dcmread", return_value=mock_img):
+        assert ImageLoader("dummy.dcm", preview=False).get_preview_pyramid() is None
+
+
+def test_preview_levels_arrive_before_normalization():
+    """
+    Prueba que la vista previa se entrega de forma progresiva y temprana.
+    Verifica que:
+        - on_preview recibe primero un nivel grueso y luego el final (250x250).
+        - Ambos niveles llegan antes de la normalización RGB.
+        - La imagen PIL a resolución completa no se genera si no se pide.
+    """
+    mock_img = MagicMock()
+    mock_img.pixel_array = np.random.randint(0, 4096, (1200, 1000), dtype=np.uint16)
+    events = []
+    to_RGB = ImageLoader.to_RGB
+
+    def recording_to_RGB(img_array):
+        events.append("rgb")
+        return to_RGB(img_array)
+
+    with patch("pydicom.dcmread", return_value=mock_img), \
+            patch.object(ImageLoader, "to_RGB", side_effect=recording_to_RGB):
+        loader = ImageLoader("dummy.dcm", on_preview=lambda level: events.append(level.size))
+
+    assert len(events) == 3
+    assert max(events[0]) < 250
+    assert events[1:] == [(250, 250), "rgb"]
+    assert loader._img2show is None
+    assert loader.get_img_to_show().size == (1000, 1200)
@@ -0,0 +1,154 @@
+import pytest
+import numpy as np
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage, generate_uid
+from src import read_study
+from src.read_study import StudyLoader
+
+
+def _write_dicom(path, frames):
+    """Escribe un DICOM sin compresión de 16 bits con uno o varios frames."""
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.Rows, ds.Columns = frames.shape[-2:]
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 0
+    if frames.ndim == 3:
+        ds.NumberOfFrames = frames.shape[0]
+    ds.PixelData = frames.astype(np.uint16).tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+def test_iter_frames_multiframe(tmp_path):
+    """
+    Prueba que un DICOM multi-frame se recorre frame a frame.
+    Verifica que:
+        - Se genera un resultado por cada frame del archivo.
+        - Los índices de frame son consecutivos.
+        - Cada frame se normaliza a RGB uint8 con la forma original.
+    """
+    path = tmp_path / "multi.dcm"
+    frames = np.stack([np.full((8, 6), value, dtype=np.uint16) for value in (100, 200, 300)])
+    _write_dicom(path, frames)
+
+    results = list(StudyLoader(str(path)).iter_frames())
+
+    assert [frame_index for _, frame_index, _ in results] == [0, 1, 2]
+    for _, _, img_RGB in results:
+        assert img_RGB.shape == (8, 6, 3)
+        assert img_RGB.dtype == np.uint8
+
+
+def test_iter_frames_directory(tmp_path):
+    """
+    Prueba que un directorio se trata como un estudio de varias vistas.
+    Verifica que:
+        - Los archivos se recorren en orden alfabético.
+        - Cada archivo de un solo frame aporta un resultado.
+    """
+    _write_dicom(tmp_path / "b_lateral.dcm", np.arange(48).reshape(8, 6))
+    _write_dicom(tmp_path / "a_pa.dcm", np.arange(48).reshape(8, 6))
+
+    results = list(StudyLoader(str(tmp_path)).iter_frames())
+
+    assert [path.split("/")[-1] for path, _, _ in results] == ["a_pa.dcm", "b_lateral.dcm"]
+
+
+def test_iter_frames_is_lazy(tmp_path, monkeypatch):
+    """
+    Prueba que los frames se generan bajo demanda y no al construir el lector.
+    Verifica que:
+        - Construir el lector y el generador no decodifica ningún frame.
+        - Cada next() decodifica exactamente un frame.
+    """
+    path = tmp_path / "multi.dcm"
+    _write_dicom(path, np.ones((4, 8, 6)))
+
+    decoded = []
+
+    def counting_iter_pixels(source):
+        for frame in range(4):
+            decoded.append(frame)
+            yield np.ones((8, 6), dtype=np.uint16)
+
+    monkeypatch.setattr(read_study, "iter_pixels", counting_iter_pixels)
+
+    frames = StudyLoader(str(path)).iter_frames()
+    assert decoded == []
+
+    source, frame_index, _ = next(frames)
+
+    assert source == str(path)
+    assert frame_index == 0
+    assert decoded == [0]
+
+    next(frames)
+    assert decoded == [0, 1]
+
+
+def test_directory_skips_non_dicom_files(tmp_path):
+    """
+    Prueba que los archivos que no son imágenes DICOM se ignoran.
+    Verifica que:
+        - Notas, archivos ocultos y datasets sin píxeles no entran al estudio.
+        - Un directorio sin imágenes DICOM produce ValueError.
+    """
+    _write_dicom(tmp_path / "a.dcm", np.arange(48).reshape(8, 6))
+    (tmp_path / "notes.txt").write_text("placa de control")
+    (tmp_path / ".DS_Store").write_bytes(b"\x00\x00\x00\x01Bud1")
+
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = "1.2.840.10008.1.3.10"  # Media Storage Directory
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    dicomdir = Dataset()
+    dicomdir.file_meta = meta
+    dicomdir.FileSetID = "ESTUDIO"
+    dicomdir.save_as(tmp_path / "DICOMDIR", enforce_file_format=True)
+
+    results = list(StudyLoader(str(tmp_path)).iter_frames())
+
+    assert [path.split("/")[-1] for path, _, _ in results] == ["a.dcm"]
+
+    empty = tmp_path / "vacio"
+    empty.mkdir()
+    (empty / "notes.txt").write_text("sin imágenes")
+    with pytest.raises(ValueError):
+        StudyLoader(str(empty))
+
+
+def test_iter_frames_in_memory(tmp_path):
+    """
+    Prueba que un DICOM multi-frame en memoria se lee sin archivo en disco.
+    Verifica que:
+        - bytes y memoryview producen los mismos frames que la ruta.
+        - Las entradas en memoria reciben un nombre <memoria:i>.
+    """
+    path = tmp_path / "multi.dcm"
+    frames = np.stack([np.full((8, 6), value, dtype=np.uint16) for value in (100, 300)])
+    _write_dicom(path, frames)
+    payload = path.read_bytes()
+
+    from_path = list(StudyLoader(str(path)).iter_frames())
+    from_memory = list(StudyLoader([payload, memoryview(payload)]).iter_frames())
+
+    assert [name for name, _, _ in from_memory] == ["<memoria:0>"] * 2 + ["<memoria:1>"] * 2
+    for (_, _, expected), (_, _, actual) in zip(from_path * 2, from_memory):
+        assert np.array_equal(expected, actual)
+
+
+def test_missing_study():
+    """Prueba que una ruta inexistente produce FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        StudyLoader("no-existe")
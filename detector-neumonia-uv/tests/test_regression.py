@@ -0,0 +1,120 @@
+import pytest
+import numpy as np
+from src.regression import (
+    build_samples,
+    compare_outputs,
+    heatmap_correlation,
+    make_synthetic_dicom,
+)
+
+
+def _output(label_idx, probabilities, heatmap, confidence=None):
+    probabilities = None if probabilities is None else np.array(probabilities)
+    return {
+        'label_idx': label_idx,
+        'confidence': confidence,
+        'probabilities': probabilities,
+        'heatmap': heatmap
+    }
+
+
+def test_synthetic_dicom_is_deterministic():
+    """
+    Prueba que el conjunto sintético es fijo para una misma semilla.
+    Verifica que:
+        - La misma semilla produce exactamente los mismos bytes.
+        - Semillas distintas producen imágenes distintas.
+    """
+    assert make_synthetic_dicom(3) == make_synthetic_dicom(3)
+    assert make_synthetic_dicom(3) != make_synthetic_dicom(4)
+
+
+def test_build_samples_loads_images():
+    """
+    Prueba que las muestras se cargan con ImageLoader desde memoria
+    como imágenes RGB uint8 con el tamaño pedido.
+    """
+    samples = build_samples(n_images=2, seed=0)
+
+    assert [sample['name'] for sample in samples] == ["sintetica_0", "sintetica_1"]
+    for sample in samples:
+        assert sample['array'].dtype == np.uint8
+        assert sample['array'].ndim == 3 and sample['array'].shape[2] == 3
+
+    sample = build_samples(n_images=1, seed=0)[0]
+    assert np.array_equal(sample['array'], samples[0]['array'])
+
+
+def test_heatmap_correlation():
+    """
+    Prueba la correlación de heatmaps.
+    Verifica que:
+        - Un heatmap contra sí mismo da 1.0.
+        - Un heatmap invertido da -1.0.
+        - Formas distintas producen ValueError.
+    """
+    heatmap = np.arange(12, dtype=np.uint8).reshape(2, 2, 3)
+
+    assert heatmap_correlation(heatmap, heatmap) == pytest.approx(1.0)
+    assert heatmap_correlation(heatmap, 255 - heatmap) == pytest.approx(-1.0)
+    assert heatmap_correlation(np.zeros(4), np.zeros(4)) == 1.0
+    with pytest.raises(ValueError):
+        heatmap_correlation(heatmap, heatmap[0])
+
+
+def test_compare_outputs_passes_within_tolerance():
+    """Prueba que diferencias numéricas mínimas pasan las tolerancias."""
+    heatmap = np.arange(12, dtype=np.float64)
+    reference = [_output(0, [0.7, 0.2, 0.1], heatmap)]
+    candidate = [_output(0, [0.70001, 0.19999, 0.1], heatmap + 0.01)]
+
+    report = compare_outputs(reference, candidate)
+
+    assert report['max_prob_delta'] == pytest.approx(1e-5)
+    assert report['label_agreement'] == 1.0
+    assert report['passed']
+
+
+def test_compare_outputs_uses_confidence_without_probabilities():
+    """
+    Prueba que, sin vector de probabilidades, se compara la confianza de
+    la clase reportada contra la probabilidad de referencia de esa clase.
+    """
+    heatmap = np.arange(12, dtype=np.float64)
+    reference = [_output(0, [0.7, 0.2, 0.1], heatmap)]
+    candidate = [_output(0, None, heatmap, confidence=0.69)]
+
+    report = compare_outputs(reference, candidate)
+
+    assert report['max_prob_delta'] == pytest.approx(0.01)
+    assert not report['passed']
+    assert compare_outputs(reference, candidate, {'max_prob_delta': 0.02})['passed']
+
+
+def test_compare_outputs_detects_label_change():
+    """Prueba que un cambio de etiqueta hace fallar la comparación."""
+    heatmap = np.arange(12, dtype=np.float64)
+    reference = [_output(0, [0.5, 0.4, 0.1], heatmap)] * 2
+    candidate = [_output(0, [0.5, 0.4, 0.1], heatmap), _output(1, [0.5, 0.4, 0.1], heatmap)]
+
+    report = compare_outputs(reference, candidate)
+
+    assert report['label_agreement'] == 0.5
+    assert not report['passed']
+
+
+def test_compare_outputs_checks_every_class_heatmap():
+    """
+    Prueba que, si el candidato trae los CAM de todas las clases, se
+    comparan todos y no solo el de la clase predicha.
+    """
+    cams = {class_idx: np.arange(16, dtype=np.float64) * (class_idx + 1) for class_idx in range(3)}
+    reference = [dict(_output(0, [0.7, 0.2, 0.1], cams[0]), heatmaps=cams)]
+    matching = [dict(_output(0, [0.7, 0.2, 0.1], cams[0]), heatmaps=dict(cams))]
+    broken = [dict(_output(0, [0.7, 0.2, 0.1], cams[0]), heatmaps={**cams, 2: cams[2][::-1]})]
+
+    assert compare_outputs(reference, matching)['passed']
+
+    report = compare_outputs(reference, broken)
+    assert report['min_heatmap_correlation'] == pytest.approx(-1.0)
+    assert not report['passed']
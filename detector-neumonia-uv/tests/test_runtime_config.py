@@ -0,0 +1,69 @@
+import os
+
+import cv2
+import pytest
+from src.runtime_config import (
+    RuntimeConfig,
+    INTRA_OP_ENV_VAR,
+    OPENCV_THREADS_ENV_VAR,
+    CPU_AFFINITY_ENV_VAR,
+)
+
+
+def test_parse_cpu_list():
+    """Prueba que los rangos y núcleos sueltos se expanden y ordenan."""
+    assert RuntimeConfig.parse_cpu_list("6,0-3") == [0, 1, 2, 3, 6]
+    assert RuntimeConfig.parse_cpu_list("2,2,") == [2]
+
+
+def test_from_env_and_to_env(monkeypatch):
+    """
+    Prueba que la configuración se lee del entorno y se puede volver a
+    exportar para lanzar workers con la misma topología.
+    """
+    monkeypatch.setenv(INTRA_OP_ENV_VAR, "2")
+    monkeypatch.setenv(OPENCV_THREADS_ENV_VAR, "1")
+    monkeypatch.setenv(CPU_AFFINITY_ENV_VAR, "0-1")
+
+    config = RuntimeConfig.from_env()
+
+    assert config.intra_op_threads == 2
+    assert config.inter_op_threads is None
+    assert config.opencv_threads == 1
+    assert config.cpu_affinity == [0, 1]
+    assert config.to_env() == {
+        INTRA_OP_ENV_VAR: "2",
+        OPENCV_THREADS_ENV_VAR: "1",
+        CPU_AFFINITY_ENV_VAR: "0,1",
+    }
+
+
+def test_rejects_negative_threads():
+    """Prueba que un número de hilos negativo produce ValueError."""
+    with pytest.raises(ValueError):
+        RuntimeConfig(opencv_threads=-1)
+
+
+def test_apply_opencv_threads():
+    """
+    Prueba que apply fija el pool de OpenCV sin requerir TensorFlow
+    cuando no se configuran los pools de TF.
+    """
+    previous = cv2.getNumThreads()
+    try:
+        RuntimeConfig(opencv_threads=1).apply()
+        assert cv2.getNumThreads() == 1
+    finally:
+        cv2.setNumThreads(previous)
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Requiere sched_setaffinity")
+def test_apply_cpu_affinity():
+    """Prueba que apply ancla el proceso a los núcleos indicados."""
+    previous = os.sched_getaffinity(0)
+    cpu = min(previous)
+    try:
+        RuntimeConfig(cpu_affinity=[cpu]).apply()
+        assert os.sched_getaffinity(0) == {cpu}
+    finally:
+        os.sched_setaffinity(0, previous)